@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Adaptive Question Endpoint for Wit Content API
+Questions for a player rating, served from the sorted difficulty index
+"""
+
+import os
+import random
+from typing import Any, Dict, Optional, Set
+
+from flask import Blueprint, request, jsonify
+
+from difficulty_index import ADAPTIVE_WINDOW, get_question_source
+from request_params import parse_seed
+from timing import stage
+
+ADAPTIVE_MAX_COUNT = int(os.environ.get('WIT_ADAPTIVE_MAX_COUNT', 100))
+
+adaptive_bp = Blueprint('adaptive', __name__)
+
+
+def _int(data: Dict[str, Any], name: str, default: Optional[int] = None) -> Optional[int]:
+    value = data.get(name)
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+
+
+def _exclude(value: Any) -> Set[int]:
+    """Ids to leave out, as a JSON list or the comma-separated form a query string carries"""
+    if value is None or value == '':
+        return set()
+    if isinstance(value, str):
+        value = [part for part in value.split(',') if part.strip()]
+    if not isinstance(value, list):
+        raise ValueError("exclude must be a list of question ids")
+    try:
+        return {int(item) for item in value}
+    except (TypeError, ValueError):
+        raise ValueError("exclude must be a list of question ids")
+
+
+def parse_adaptive_params(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalise an /adaptive-questions body or query string"""
+    rating = _int(data, 'rating')
+    if rating is None:
+        raise ValueError("rating is required")
+    count = _int(data, 'count', 10)
+    if not 1 <= count <= ADAPTIVE_MAX_COUNT:
+        raise ValueError(f"count must be between 1 and {ADAPTIVE_MAX_COUNT}")
+    window = _int(data, 'window', ADAPTIVE_WINDOW)
+    if window < 0:
+        raise ValueError("window must not be negative")
+
+    spread = data.get('spread')
+    if spread is not None and spread != '':
+        try:
+            spread = float(spread)
+        except (TypeError, ValueError):
+            raise ValueError("spread must be a number")
+        if spread <= 0:
+            raise ValueError("spread must be positive")
+    else:
+        spread = None
+
+    return {
+        "domain": data.get('domain', 'quant'),
+        "rating": rating,
+        "count": count,
+        "window": window,
+        "exclude": _exclude(data.get('exclude')),
+        "spread": spread,
+        "seed": parse_seed(data.get('seed')) if spread is not None else None
+    }
+
+
+@adaptive_bp.route('/adaptive-questions', methods=['GET', 'POST'])
+def adaptive_questions():
+    """Questions for a domain closest to a rating, or sampled around it with ?spread=
+
+    POST takes the same fields as a JSON body, for exclusion lists too long
+    for a URL.
+    """
+    try:
+        with stage('parse'):
+            data = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+            params = parse_adaptive_params(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        with stage('select'):
+            source = get_question_source()
+            if params['spread'] is None:
+                picked = source.index.nearest(params['domain'], params['rating'], params['count'],
+                                              params['window'], params['exclude'])
+            else:
+                picked = source.index.sample(params['domain'], params['rating'], params['count'], params['spread'],
+                                             params['window'], params['exclude'], random.Random(params['seed']))
+
+        with stage('fetch'):
+            questions = source.fetch([question_id for _, question_id, _ in picked])
+
+        with stage('serialise'):
+            response = {
+                "success": True,
+                "questions": questions,
+                "count": len(questions),
+                "domain": params['domain'],
+                "rating": params['rating'],
+                "window": params['window'],
+                "source": source.name
+            }
+            if params['seed'] is not None:
+                response['seed'] = params['seed']
+            return jsonify(response)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Core API Routes for Wit Content API
+Question, challenge and validation endpoints shared by every entry point
+"""
+
+from datetime import datetime, timedelta
+
+from flask import Blueprint, request, jsonify
+
+from serialization import encode_challenges, encode_items, envelope_response
+from streaming import wants_ndjson, ndjson_response
+from request_params import (json_object, parse_date, parse_question_params, parse_bulk_questions_params,
+                            parse_bulk_challenges_params)
+from daily_challenges import generate_daily_challenge_for_date, iter_daily_challenges
+from parallel import generate_bulk_batches_parallel, PARALLEL_MIN_ITEMS
+from question_batch import generate_bulk_batches, iter_batch_dicts
+from dedup import iter_unique_bulk_questions
+from question_generator import generate_questions_for_domain, bulk_slices, iter_bulk_questions
+from question_store import require_store
+from pagination import bulk_questions_page, daily_challenges_page
+from startup import STARTUP
+from timing import stage
+from progress_stats import (counted_questions, record_questions, record_question_slices, record_challenges,
+                            record_validation)
+
+api_bp = Blueprint('api', __name__)
+
+@api_bp.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    if STARTUP.mark_healthy():
+        print(f"⏱️  Startup (pid {STARTUP.pid}): {STARTUP.summary()}", flush=True)
+    return jsonify({
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "version": "2.0.0",
+        "environment": "production",
+        "features": ["question_generation", "daily_challenges", "validation", "bulk_processing"],
+        "startup": STARTUP.to_dict()
+    })
+
+@api_bp.route('/generate-questions', methods=['POST'])
+def generate_questions():
+    """Generate questions for a specific domain"""
+    try:
+        with stage('parse'):
+            try:
+                params = parse_question_params(json_object(request))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            domain = params['domain']
+            count = params['count']
+            difficulty_range = params['difficulty_range']
+            source = params['source']
+            seed = params['seed']
+        
+        with stage('generate'):
+            questions = generate_questions_for_domain(domain, count, difficulty_range, source, seed)
+        record_questions(domain, difficulty_range, source, len(questions))
+        
+        with stage('serialise'):
+            return jsonify({
+                "success": True,
+                "questions": questions,
+                "count": len(questions),
+                "domain": domain,
+                "difficulty_range": difficulty_range,
+                "seed": seed
+            })
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api_bp.route('/generate-daily-challenge', methods=['POST'])
+def generate_daily_challenge():
+    """Generate a daily challenge for a specific date"""
+    try:
+        try:
+            data = json_object(request)
+            target_date = parse_date(data.get('date', datetime.now().strftime('%Y-%m-%d')), 'date')
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        challenge_type = data.get('type', 'auto')
+        
+        challenge = generate_daily_challenge_for_date(target_date, challenge_type)
+        record_challenges((challenge,))
+        
+        return jsonify({
+            "success": True,
+            "challenge": challenge,
+            "date": target_date,
+            "type": challenge_type
+        })
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api_bp.route('/generate-bulk-questions', methods=['POST'])
+def generate_bulk_questions():
+    """Generate bulk questions for 10k goal"""
+    try:
+        # The n8n string-to-JSON fallbacks run inside the parse stage
+        with stage('parse'):
+            try:
+                params = parse_bulk_questions_params(json_object(request))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        
+        if params['page_size'] is not None:
+            return _bulk_questions_page(params)
+        domains = params['domains']
+        questions_per_domain = params['questions_per_domain']
+        difficulty_distribution = params['difficulty_distribution']
+        seed = params['seed']
+        
+        slices = bulk_slices(domains, questions_per_domain, difficulty_distribution)
+        total_count = sum(count for _, _, count in slices)
+        unique = params['unique']
+        uniqueness = {}
+        
+        if unique:
+            questions = iter_unique_bulk_questions(domains, questions_per_domain, difficulty_distribution,
+                                                   seed=seed, report=uniqueness)
+        else:
+            questions = iter_bulk_questions(domains, questions_per_domain, difficulty_distribution, seed=seed)
+        
+        store = require_store() if params['store'] else None
+        
+        # Opt-in NDJSON streaming keeps memory flat for large runs
+        if wants_ndjson(request):
+            if store is not None:
+                questions = store.tee(questions)
+            # Counted as sent, so an aborted stream only counts what the client got
+            response = ndjson_response(counted_questions(questions), total_count=None if unique else total_count)
+            response.headers['X-Seed'] = str(seed)
+            return response
+        
+        parallel = params['parallel'] and not unique and total_count >= PARALLEL_MIN_ITEMS
+        
+        # Questions stay columnar until they are encoded
+        with stage('generate'):
+            if unique:
+                all_questions = list(counted_questions(questions))
+                generated = len(all_questions)
+            else:
+                if parallel:
+                    batches = generate_bulk_batches_parallel(domains, questions_per_domain, difficulty_distribution, seed=seed)
+                else:
+                    batches = generate_bulk_batches(domains, questions_per_domain, difficulty_distribution, seed=seed)
+                all_questions = iter_batch_dicts(batches)
+                generated = sum(len(batch) for batch in batches)
+                record_question_slices(slices)
+        
+        if store is not None:
+            with stage('store'):
+                stored = store.add_many(all_questions if unique else iter_batch_dicts(batches))
+        
+        result = {
+            "success": True,
+            "total_count": generated,
+            "domains": domains,
+            "distribution": difficulty_distribution,
+            "parallel": parallel,
+            "seed": seed
+        }
+        if unique:
+            result["uniqueness"] = uniqueness
+        if store is not None:
+            result["stored"] = stored
+        
+        # Columnar batches expand to dicts here, so this includes that cost
+        with stage('serialise'):
+            return envelope_response(result, "questions", encode_items(all_questions))
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def _bulk_questions_page(params):
+    """One cursor-addressed page of a bulk question run, generated on its own"""
+    if params['unique']:
+        return jsonify({"error": "unique runs cannot be paged; drop page_size or unique"}), 400
+    try:
+        with stage('generate'):
+            page = bulk_questions_page(params)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    record_question_slices(page['slices'])
+    
+    result = {
+        "success": True,
+        "total_count": page['total_count'],
+        "count": len(page['questions']),
+        "page_size": params['page_size'],
+        "next_cursor": page['next_cursor'],
+        "domains": params['domains'],
+        "distribution": params['difficulty_distribution'],
+        "seed": page['seed']
+    }
+    if params['store']:
+        with stage('store'):
+            result["stored"] = require_store().add_many(page['questions'])
+    
+    with stage('serialise'):
+        return envelope_response(result, "questions", encode_items(page['questions']))
+
+@api_bp.route('/generate-daily-challenges-bulk', methods=['POST'])
+def generate_daily_challenges_bulk():
+    """Generate 2 years of daily challenges"""
+    try:
+        with stage('parse'):
+            try:
+                params = parse_bulk_challenges_params(json_object(request))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        
+        if params['page_size'] is not None:
+            return _daily_challenges_page(params)
+        start_date = params['start_date']
+        days = params['days']
+        
+        with stage('generate'):
+            challenges = list(iter_daily_challenges(start_date, days))
+        record_challenges(challenges)
+        current_date = datetime.strptime(start_date, '%Y-%m-%d')
+        
+        # Challenge bodies are spliced in from pre-encoded fragments
+        with stage('serialise'):
+            return envelope_response({
+                "success": True,
+                "total_count": len(challenges),
+                "start_date": start_date,
+                "end_date": (current_date + timedelta(days=days-1)).strftime('%Y-%m-%d')
+            }, "challenges", encode_challenges(challenges))
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def _daily_challenges_page(params):
+    """One cursor-addressed page of a bulk daily challenge run"""
+    try:
+        with stage('generate'):
+            page = daily_challenges_page(params)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    record_challenges(page['challenges'])
+    
+    with stage('serialise'):
+        return envelope_response({
+            "success": True,
+            "total_count": page['total_count'],
+            "count": len(page['challenges']),
+            "page_size": params['page_size'],
+            "next_cursor": page['next_cursor'],
+            "start_date": params['start_date']
+        }, "challenges", encode_challenges(page['challenges']))
+
+@api_bp.route('/validate', methods=['POST'])
+def validate_questions():
+    """Simple validation endpoint"""
+    try:
+        data = request.get_json()
+        questions_data = data.get('questions', [])
+        
+        if not questions_data:
+            return jsonify({"error": "No questions provided"}), 400
+        
+        # Simple validation - just check structure
+        valid_questions = []
+        invalid_questions = []
+        
+        for question in questions_data:
+            # Basic structure validation
+            required_fields = ['stem', 'choices', 'answer', 'domain', 'difficulty']
+            is_valid = all(field in question for field in required_fields)
+            
+            if is_valid and len(question.get('choices', [])) == 4:
+                valid_questions.append(question)
+            else:
+                invalid_questions.append(question)
+        
+        record_validation(len(valid_questions), len(invalid_questions))
+        
+        return jsonify({
+            "success": True,
+            "valid_count": len(valid_questions),
+            "invalid_count": len(invalid_questions),
+            "total_count": len(questions_data),
+            "success_rate": len(valid_questions) / len(questions_data) if questions_data else 0,
+            "valid_questions": valid_questions,
+            "invalid_questions": invalid_questions
+        })
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -3,8 +3,10 @@
 Main application entry point for Railway deployment
 """
 
-from simple_server import app
+from app_factory import create_app
 import os
 
+app = create_app()
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), debug=False) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), debug=False)
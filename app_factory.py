@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Application Factory for Wit Content API
+Single place where the Flask app is assembled for every entry point
+"""
+
+# Imported first so the import timing below covers everything else
+from startup import STARTUP
+
+import os
+import random
+from datetime import date
+from typing import Any, Dict, Optional
+
+from flask import Flask
+from flask_cors import CORS
+
+from adaptive_routes import adaptive_bp
+from api_routes import api_bp
+from batch import batch_bp
+from compression import init_compression
+from daily_challenge_routes import daily_challenge_bp
+from daily_challenges import challenge_body
+from idempotency import init_idempotency
+from jobs import jobs_bp
+from metrics import init_metrics, metrics_bp
+from progress_stats import stats_bp
+from question_bank import get_question_bank
+from serialization import init_json
+from store_routes import store_bp
+from template_engine import PARAMETRIC_TEMPLATES, render
+from timing import init_timing
+
+STARTUP.mark_imports()
+
+# Build expensive structures when the app is created rather than on the first request
+WARM_UP = os.environ.get('WIT_WARM_UP', '1').lower() not in ('0', 'false', 'no', 'off')
+
+ENDPOINTS = (
+    ("GET ", "/health", "Health check"),
+    ("POST", "/generate-questions", "Generate domain questions"),
+    ("POST", "/generate-batch", "Generate several question specs in one call"),
+    ("POST", "/generate-daily-challenge", "Generate daily challenge"),
+    ("POST", "/generate-bulk-questions", "Generate 10k questions"),
+    ("GET ", "/daily-challenge/<YYYY-MM-DD>", "Cacheable daily challenge"),
+    ("POST", "/generate-daily-challenges-bulk", "Generate 2 years of challenges"),
+    ("POST", "/validate", "Validate questions"),
+    ("POST", "/jobs/bulk-questions", "Start a background bulk question job"),
+    ("POST", "/jobs/daily-challenges-bulk", "Start a background daily challenge job"),
+    ("GET ", "/jobs/<id>", "Job progress (DELETE to cancel)"),
+    ("GET ", "/jobs/<id>/results", "Paged job results"),
+    ("GET ", "/questions", "Stored questions, keyset paged (?cursor=&limit=)"),
+    ("GET ", "/questions/<id>", "One stored question"),
+    ("GET ", "/adaptive-questions", "Questions nearest a rating (?domain=&rating=&count=)"),
+    ("GET ", "/stats", "Progress toward the 10k question goal"),
+    ("GET ", "/metrics", "Prometheus metrics"),
+)
+
+
+def _warm_templates() -> None:
+    rng = random.Random(0)
+    for template in PARAMETRIC_TEMPLATES:
+        render(template, rng)
+
+
+def _warm_challenges() -> None:
+    today = date.today().toordinal()
+    for ordinal in (today - 1, today, today + 1):
+        challenge_body(ordinal)
+
+
+def warm_up() -> Dict[str, float]:
+    """Build the question bank and prime hot caches, timing each step
+
+    Safe to call more than once; later calls find everything already built.
+    The parallel process pool is deliberately left lazy so it is never
+    created before a Gunicorn fork.
+    """
+    STARTUP.time_step('question_bank', get_question_bank)
+    STARTUP.time_step('templates', _warm_templates)
+    STARTUP.time_step('daily_challenges', _warm_challenges)
+    return dict(STARTUP.warm_up)
+
+
+def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
+    """Build the API app
+
+    config is applied to app.config; set WARM_UP to False to defer warm_up()
+    to the caller, e.g. an ASGI lifespan hook.
+    """
+    app = Flask(__name__)
+    app.config['WARM_UP'] = WARM_UP
+    app.config.update(config or {})
+
+    CORS(app)
+    app.register_blueprint(api_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(batch_bp)
+    app.register_blueprint(daily_challenge_bp)
+    app.register_blueprint(store_bp)
+    app.register_blueprint(adaptive_bp)
+    app.register_blueprint(stats_bp)
+    app.register_blueprint(metrics_bp)
+    init_metrics(app)
+    init_timing(app)
+    init_idempotency(app)
+    init_compression(app)
+    init_json(app)
+
+    if app.config['WARM_UP']:
+        warm_up()
+    STARTUP.mark_app_ready()
+    return app
+
+
+def print_banner(title: str, port: int) -> None:
+    """Endpoint list printed by the development entry points"""
+    print(f"🚀 Starting {title} Wit Content Generation API Server...")
+    print("📡 API Endpoints:")
+    for method, path, description in ENDPOINTS:
+        print(f"  {method} {path} - {description}")
+    print(f"⏱️  Startup: {STARTUP.summary()}")
+    print(f"🌐 Server running on port {port}")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+ASGI Server for Wit Content API
+Asyncio front end exposing the same routes as the Flask app
+
+Usage: uvicorn asgi_app:app --host 0.0.0.0 --port $PORT
+
+Health checks are answered on the event loop, NDJSON bulk streams are
+produced in executor-sized chunks and written with backpressure, and every
+other route runs the Flask app on a thread pool so slow requests never
+block the loop.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.exceptions import BadRequest
+from werkzeug.http import parse_accept_header
+
+from app_factory import WARM_UP, create_app, warm_up
+from compression import COMPRESSION_ENABLED, COMPRESSION_LEVEL, ENCODINGS, choose_encoding
+from dedup import iter_unique_bulk_questions
+from metrics import record_request, track_in_flight
+from progress_stats import counted_questions
+from question_generator import bulk_slices, iter_bulk_questions
+from question_store import require_store
+from request_params import parse_bulk_questions_params
+from serialization import dumps
+from streaming import NDJSON_MIMETYPE
+
+ASGI_WORKERS = int(os.environ.get('WIT_ASGI_WORKERS', 8))
+
+# Largest request body accepted, in bytes
+ASGI_MAX_BODY = int(os.environ.get('WIT_ASGI_MAX_BODY', 16 * 1024 * 1024))
+
+# Questions encoded per executor call when streaming
+ASGI_STREAM_CHUNK = int(os.environ.get('WIT_ASGI_STREAM_CHUNK', 500))
+
+# Routes cheap enough to run directly on the event loop
+INLINE_PATHS = frozenset(('/health',))
+
+executor = ThreadPoolExecutor(max_workers=ASGI_WORKERS, thread_name_prefix='wit-asgi')
+
+# Warm-up runs in the lifespan startup hook, off the event loop
+flask_app = create_app({'WARM_UP': False})
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+async def read_body(receive: Callable) -> bytes:
+    """Collect the request body, refusing anything over ASGI_MAX_BODY"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionError("client disconnected")
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > ASGI_MAX_BODY:
+            raise ValueError("request body too large")
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+def header(scope: Dict[str, Any], name: bytes) -> str:
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+
+def build_environ(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    """PEP 3333 environ for an ASGI HTTP scope"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for key, value in scope['headers']:
+        name = key.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            name = f'HTTP_{name}'
+            environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+def call_wsgi(environ: Dict[str, Any]) -> Tuple[int, Headers, bytes]:
+    """Run the Flask app to completion and buffer its response"""
+    response: Dict[str, Any] = {}
+
+    def start_response(status: str, headers: List[Tuple[str, str]], exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+        return lambda data: None
+
+    iterable = flask_app(environ, start_response)
+    try:
+        body = b''.join(iterable)
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+    return response['status'], response['headers'], body
+
+
+async def send_response(send: Callable, status: int, headers: Headers, body: bytes) -> None:
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _wants_ndjson(scope: Dict[str, Any]) -> bool:
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    if query.get('stream', [''])[0].lower() in ('1', 'true', 'yes'):
+        return True
+    accept = parse_accept_header(header(scope, b'accept'), MIMEAccept)
+    return any(mimetype == NDJSON_MIMETYPE and quality > 0 for mimetype, quality in accept)
+
+
+def _ndjson_chunks(questions: Iterator[Dict], encoding: Optional[str]) -> Callable[[], bytes]:
+    """Callable returning the next encoded chunk, or b'' once exhausted"""
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, ENCODINGS[encoding]) if encoding else None
+    state = {'done': False}
+
+    def next_chunk() -> bytes:
+        if state['done']:
+            return b''
+        lines = []
+        for question in questions:
+            lines.append(dumps(question) + b'\n')
+            if len(lines) >= ASGI_STREAM_CHUNK:
+                break
+        else:
+            state['done'] = True
+        data = b''.join(lines)
+        if compressor is None:
+            return data
+        data = compressor.compress(data)
+        return data + compressor.flush(zlib.Z_FINISH if state['done'] else zlib.Z_SYNC_FLUSH)
+
+    return next_chunk
+
+
+async def stream_bulk_questions(scope: Dict[str, Any], body: bytes, send: Callable) -> Optional[int]:
+    """NDJSON /generate-bulk-questions with chunks generated off the loop; returns bytes sent
+
+    Returns None without responding for a paged request, which Flask serves.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        data = await loop.run_in_executor(executor, flask_app.json.loads, body)
+        if not isinstance(data, dict):
+            raise ValueError
+    except ValueError:
+        raise BadRequest("Request body must be a JSON object")
+    try:
+        params = parse_bulk_questions_params(data)
+    except ValueError as e:
+        raise BadRequest(str(e))
+    if params['page_size'] is not None:
+        return None
+    domains, per_domain, distribution = params['domains'], params['questions_per_domain'], params['difficulty_distribution']
+    slices = bulk_slices(domains, per_domain, distribution)
+    total_count = sum(count for _, _, count in slices)
+
+    if params['unique']:
+        questions = iter_unique_bulk_questions(domains, per_domain, distribution, seed=params['seed'])
+    else:
+        questions = iter_bulk_questions(domains, per_domain, distribution, seed=params['seed'])
+    if params['store']:
+        questions = require_store().tee(questions)
+    # Counted as encoded, so a failed or abandoned stream only counts what was produced
+    questions = counted_questions(questions)
+
+    encoding = None
+    if COMPRESSION_ENABLED:
+        encoding = choose_encoding(parse_accept_header(header(scope, b'accept-encoding')))
+
+    headers = [
+        (b'content-type', NDJSON_MIMETYPE.encode()),
+        (b'x-seed', str(params['seed']).encode()),
+        (b'access-control-allow-origin', b'*'),
+        (b'vary', b'Accept-Encoding'),
+    ]
+    if not params['unique']:
+        headers.append((b'x-total-count', str(total_count).encode()))
+    if encoding:
+        headers.append((b'content-encoding', encoding.encode()))
+
+    next_chunk = _ndjson_chunks(questions, encoding)
+    await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+    sent = 0
+    while True:
+        chunk = await loop.run_in_executor(executor, next_chunk)
+        if not chunk:
+            break
+        # send() applies the server's flow control, so a slow client pauses generation
+        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        sent += len(chunk)
+    await send({'type': 'http.response.body', 'body': b''})
+    return sent
+
+
+async def lifespan(receive: Callable, send: Callable) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            if WARM_UP:
+                await asyncio.get_running_loop().run_in_executor(executor, warm_up)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        raise NotImplementedError(f"Unsupported scope type {scope['type']}")
+
+    try:
+        body = await read_body(receive)
+    except ConnectionError:
+        return
+    except ValueError as e:
+        await send_response(send, 413, [(b'content-type', b'application/json')], dumps({"error": str(e)}))
+        return
+
+    if scope['method'] == 'POST' and scope['path'] == '/generate-bulk-questions' and _wants_ndjson(scope):
+        # Served outside Flask, so its metrics are recorded here
+        started = time.perf_counter()
+        track_in_flight(1)
+        status, sent, paged = 200, None, False
+        response_started = False
+
+        async def tracked_send(message: Dict[str, Any]) -> None:
+            nonlocal response_started
+            response_started = response_started or message['type'] == 'http.response.start'
+            await send(message)
+
+        try:
+            sent = await stream_bulk_questions(scope, body, tracked_send)
+            paged = sent is None
+        except Exception as e:
+            status = e.code if isinstance(e, BadRequest) else 500
+            if response_started:
+                # Too late for an error response; abort so the client sees a truncated stream, not a complete one
+                print(f"NDJSON stream for {scope['path']} failed mid-response: {e!r}", file=sys.stderr, flush=True)
+                raise
+            message = e.description if isinstance(e, BadRequest) else str(e)
+            await send_response(send, status, [(b'content-type', b'application/json')], dumps({"error": message}))
+        finally:
+            track_in_flight(-1)
+            if not paged:
+                record_request(scope['path'], 'POST', status, time.perf_counter() - started, sent)
+        if not paged:
+            return
+
+    environ = build_environ(scope, body)
+    if scope['path'] in INLINE_PATHS:
+        status, headers, payload = call_wsgi(environ)
+    else:
+        status, headers, payload = await asyncio.get_running_loop().run_in_executor(executor, call_wsgi, environ)
+    await send_response(send, status, headers, payload)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Batched Generation Endpoint for Wit Content API
+Runs many /generate-questions specs in one round trip
+"""
+
+import os
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Tuple
+
+from flask import Blueprint, request, jsonify
+
+from parallel import get_pool, recover_pool
+from progress_stats import record_questions
+from timing import stage
+from question_generator import generate_questions_for_domain
+from request_params import parse_question_params
+
+BATCH_MAX_SPECS = int(os.environ.get('WIT_BATCH_MAX_SPECS', 100))
+BATCH_MAX_QUESTIONS = int(os.environ.get('WIT_BATCH_MAX_QUESTIONS', 100000))
+
+batch_bp = Blueprint('batch', __name__)
+
+
+def parse_spec(spec: Any) -> Dict[str, Any]:
+    """Normalise one spec with the same defaults and checks as /generate-questions"""
+    if not isinstance(spec, dict):
+        raise ValueError("spec must be an object")
+    return parse_question_params(spec)
+
+
+def parse_specs(specs: List[Any]) -> Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, Dict[str, Any]]]:
+    """(key, params) for each valid spec, plus failure results for the invalid ones
+
+    Raises ValueError when two specs share a result key, including an
+    explicit id that matches another spec's index.
+    """
+    parsed: List[Tuple[str, Dict[str, Any]]] = []
+    invalid: Dict[str, Dict[str, Any]] = {}
+    seen = set()
+    for index, spec in enumerate(specs):
+        key = str(spec.get('id', index)) if isinstance(spec, dict) else str(index)
+        if key in seen:
+            raise ValueError(f"Spec id '{key}' is used more than once; specs without an id are keyed by their index")
+        seen.add(key)
+        try:
+            parsed.append((key, parse_spec(spec)))
+        except ValueError as e:
+            invalid[key] = {"success": False, "error": str(e)}
+    return parsed, invalid
+
+
+def _submit(params: Dict[str, Any]) -> Future:
+    """Queue one spec on the shared pool, replacing the pool if a worker has died"""
+    args = (params['domain'], params['count'], params['difficulty_range'], params['source'], params['seed'])
+    pool = get_pool()
+    try:
+        return pool.submit(generate_questions_for_domain, *args)
+    except BrokenProcessPool:
+        return recover_pool(pool).submit(generate_questions_for_domain, *args)
+
+
+def run_batch(parsed: List[Tuple[str, Dict[str, Any]]], results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Run parsed specs concurrently, reporting success or failure per spec"""
+    pending: List[Tuple[str, Dict[str, Any], Future]] = [(key, params, _submit(params)) for key, params in parsed]
+
+    for key, params, future in pending:
+        try:
+            try:
+                questions = future.result()
+            except BrokenProcessPool:
+                # Everything queued on a pool fails when one of its workers dies; retry once on a fresh pool
+                questions = _submit(params).result()
+        except Exception as e:
+            results[key] = {"success": False, "error": str(e), "domain": params['domain']}
+            continue
+        record_questions(params['domain'], params['difficulty_range'], params['source'], len(questions))
+        results[key] = {
+            "success": True,
+            "questions": questions,
+            "count": len(questions),
+            "domain": params['domain'],
+            "difficulty_range": params['difficulty_range'],
+            "seed": params['seed']
+        }
+
+    return results
+
+
+@batch_bp.route('/generate-batch', methods=['POST'])
+def generate_batch():
+    """Generate questions for several specs in one request"""
+    try:
+        with stage('parse'):
+            data = request.get_json(silent=True)
+        specs = data.get('specs') if isinstance(data, dict) else data
+
+        if not isinstance(specs, list) or not specs:
+            return jsonify({"error": "specs must be a non-empty list"}), 400
+        if len(specs) > BATCH_MAX_SPECS:
+            return jsonify({"error": f"At most {BATCH_MAX_SPECS} specs per batch"}), 400
+
+        # The cap applies to parsed counts, so string counts from n8n cannot slip past it
+        try:
+            with stage('parse'):
+                parsed, results = parse_specs(specs)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        requested = sum(params['count'] for _, params in parsed)
+        if requested > BATCH_MAX_QUESTIONS:
+            return jsonify({"error": f"At most {BATCH_MAX_QUESTIONS} questions per batch"}), 400
+
+        with stage('generate'):
+            results = run_batch(parsed, results)
+        failed = sum(1 for result in results.values() if not result['success'])
+
+        with stage('serialise'):
+            return jsonify({
+                "success": failed == 0,
+                "results": results,
+                "succeeded": len(results) - failed,
+                "failed": failed,
+                "total_count": sum(result.get('count', 0) for result in results.values())
+            })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
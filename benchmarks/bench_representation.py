@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Question Representation Benchmark
+Compares memory per question and generation time for dict lists and columnar batches
+
+Usage: python benchmarks/bench_representation.py [questions_per_domain]
+"""
+
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_batch import generate_bulk_batches
+from question_generator import iter_bulk_questions
+from request_params import DEFAULT_DOMAINS, DEFAULT_DIFFICULTY_DISTRIBUTION
+
+
+def measure(label: str, build) -> dict:
+    """Time a build, then rebuild under tracemalloc to record its memory"""
+    gc.collect()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    count = sum(len(batch) for batch in result) if label == 'columnar' else len(result)
+    del result
+
+    # Tracing slows allocation down, so memory is measured on a second run
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {
+        "representation": label,
+        "questions": count,
+        "seconds": round(elapsed, 4),
+        "questions_per_second": round(count / elapsed) if elapsed else None,
+        "bytes_per_question": round(retained / count, 1) if count else None,
+        "peak_bytes_per_question": round(peak / count, 1) if count else None
+    }
+
+
+def main() -> None:
+    questions_per_domain = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    args = (DEFAULT_DOMAINS, questions_per_domain, DEFAULT_DIFFICULTY_DISTRIBUTION)
+
+    results = [
+        measure('dicts', lambda: list(iter_bulk_questions(*args, seed=1))),
+        measure('columnar', lambda: generate_bulk_batches(*args, seed=1)),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for Wit Content API
+Times the generators and the bulk endpoints, saves results as JSON and fails
+when a run regresses past the thresholds configured against a baseline
+
+Usage: python benchmarks/bench_suite.py [--cases a,b] [--output run.json]
+                                         [--baseline old.json] [--thresholds benchmarks/thresholds.json]
+
+Each case runs in its own interpreter so peak RSS belongs to that case alone.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_THRESHOLDS = os.path.join(ROOT, 'benchmarks', 'thresholds.json')
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+
+def _generate_questions(count: int) -> Callable[[], int]:
+    from question_generator import generate_questions_for_domain
+
+    def run() -> int:
+        return len(generate_questions_for_domain('quant', count, 'intermediate', 'benchmark', seed=1))
+    return run
+
+
+def _daily_challenges(days: int) -> Callable[[], int]:
+    from daily_challenges import challenge_body, generate_daily_challenge_for_date
+    dates = [(date(2025, 1, 1) + timedelta(days=offset)).isoformat() for offset in range(days)]
+
+    def run() -> int:
+        # Cold memo each time, so the case measures generation rather than cache hits
+        challenge_body.cache_clear()
+        for target_date in dates:
+            generate_daily_challenge_for_date(target_date, 'auto')
+        return days
+    return run
+
+
+def _client():
+    from app_factory import create_app
+    return create_app().test_client()
+
+
+def _post(path: str, body: Dict[str, Any], items: Callable[[Dict[str, Any]], int]) -> Callable[[], int]:
+    client = _client()
+
+    def run() -> int:
+        response = client.post(path, json=body)
+        try:
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+            return items(response.get_json())
+        finally:
+            response.close()
+    return run
+
+
+def _validate(count: int) -> Callable[[], int]:
+    from question_generator import generate_questions_for_domain
+    questions = generate_questions_for_domain('verbal', count, 'intermediate', 'benchmark', seed=1)
+    return _post('/validate', {"questions": questions}, lambda data: data['total_count'])
+
+
+def _adaptive_lookups(size: int, lookups: int, spread: bool) -> Callable[[], int]:
+    import random
+    from difficulty_index import DifficultyIndex
+    rng = random.Random(1)
+    domains = ('quant', 'verbal', 'spatial', 'logic', 'data')
+    index = DifficultyIndex((i, domains[i % len(domains)], rng.randint(400, 2000)) for i in range(1, size + 1))
+    ratings = [rng.randint(400, 2000) for _ in range(lookups)]
+    exclude = set(rng.sample(range(1, size + 1), 200))
+
+    def run() -> int:
+        sampler = random.Random(2)
+        for rating in ratings:
+            if spread:
+                index.sample('quant', rating, 10, 75.0, 300, exclude, sampler)
+            else:
+                index.nearest('quant', rating, 10, 300, exclude)
+        return lookups
+    return run
+
+
+# name -> (repetitions, factory returning a callable that does the work and returns items produced)
+CASES: Dict[str, Tuple[int, Callable[[], Callable[[], int]]]] = {
+    'generate_questions_10': (500, lambda: _generate_questions(10)),
+    'generate_questions_1k': (50, lambda: _generate_questions(1000)),
+    'generate_questions_100k': (3, lambda: _generate_questions(100000)),
+    'daily_challenges_730': (20, lambda: _daily_challenges(730)),
+    'daily_challenges_3650': (5, lambda: _daily_challenges(3650)),
+    'validate_10k': (10, lambda: _validate(10000)),
+    'bulk_questions_endpoint_10k': (5, lambda: _post(
+        '/generate-bulk-questions', {"questions_per_domain": 2000, "seed": 1, "parallel": False},
+        lambda data: data['total_count'])),
+    'bulk_challenges_endpoint_730': (20, lambda: _post(
+        '/generate-daily-challenges-bulk', {"start_date": "2025-01-01", "days": 730},
+        lambda data: data['total_count'])),
+    'adaptive_nearest_1m': (10, lambda: _adaptive_lookups(1000000, 1000, False)),
+    'adaptive_sample_1m': (10, lambda: _adaptive_lookups(1000000, 1000, True)),
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_case(name: str, repetitions: Optional[int] = None) -> Dict[str, Any]:
+    """Run one case in this process"""
+    default_repetitions, factory = CASES[name]
+    repetitions = repetitions or default_repetitions
+    work = factory()
+    work()  # warm-up run, not timed
+    baseline_rss = peak_rss_mb()
+
+    latencies = []
+    items = 0
+    for _ in range(repetitions):
+        started = time.perf_counter()
+        items = work()
+        latencies.append(time.perf_counter() - started)
+
+    latencies.sort()
+    p50 = percentile(latencies, 0.50)
+    return {
+        "case": name,
+        "repetitions": repetitions,
+        "items": items,
+        "items_per_second": round(items / p50, 1) if p50 else None,
+        "p50_ms": round(p50 * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def run_isolated(name: str, repetitions: Optional[int]) -> Dict[str, Any]:
+    """Run one case in a fresh interpreter and collect its JSON result"""
+    command = [sys.executable, os.path.abspath(__file__), '--run-case', name]
+    if repetitions:
+        command += ['--repetitions', str(repetitions)]
+    # Keep benchmark traffic out of the progress stats snapshot, and time real work rather than replays
+    env = dict(os.environ, WIT_STATS_PATH='', WIT_IDEMPOTENCY='0')
+    completed = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"case": name, "error": completed.stderr.strip().splitlines()[-1] if completed.stderr else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def load_thresholds(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {"default": {}, "cases": {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], thresholds: Dict[str, Any]) -> List[str]:
+    """Regressions beyond the configured fractional thresholds"""
+    previous = {result['case']: result for result in baseline.get('results', [])}
+    failures = []
+    for result in results:
+        before = previous.get(result['case'])
+        if before is None or 'error' in result or 'error' in before:
+            continue
+        limits = dict(thresholds.get('default', {}))
+        limits.update(thresholds.get('cases', {}).get(result['case'], {}))
+
+        checks = (
+            ('items_per_second', 'throughput_drop', -1),
+            ('p50_ms', 'p50_increase', 1),
+            ('p99_ms', 'p99_increase', 1),
+            ('peak_rss_mb', 'rss_increase', 1),
+        )
+        for metric, limit_name, direction in checks:
+            limit = limits.get(limit_name)
+            old, new = before.get(metric), result.get(metric)
+            if limit is None or not old or new is None:
+                continue
+            change = (new - old) / old * direction
+            result.setdefault('changes', {})[metric] = round((new - old) / old, 4)
+            if change > limit:
+                failures.append(f"{result['case']}: {metric} {old} -> {new} ({change:+.1%} worse, limit {limit:.0%})")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cases', help='Comma-separated case names (default: all)')
+    parser.add_argument('--repetitions', type=int, help='Override repetitions for every case')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS, help='Regression thresholds file')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.repetitions)))
+        return 0
+
+    names = args.cases.split(',') if args.cases else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}; choose from {', '.join(CASES)}")
+
+    results = []
+    for name in names:
+        result = run_isolated(name, args.repetitions)
+        results.append(result)
+        if 'error' in result:
+            print(f"{name:32} ERROR {result['error']}")
+        else:
+            print(f"{name:32} {result['items_per_second']:>12,.0f} items/s  p50 {result['p50_ms']:>9.2f} ms  "
+                  f"p99 {result['p99_ms']:>9.2f} ms  peak RSS {result['peak_rss_mb']:>7.1f} MB")
+
+    failures = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            failures = compare(results, json.load(f), load_thresholds(args.thresholds))
+
+    run = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "baseline": args.baseline,
+        "results": results,
+        "regressions": failures
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+    print(f"Results written to {output}")
+
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    errors = [result for result in results if 'error' in result]
+    return 1 if failures or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Workflow Replay Load Test for Wit Content API
+Replays the HTTP Request nodes of the shipped n8n workflows against a local
+server at a chosen concurrency and rate, and reports latency percentiles,
+error rates and throughput per endpoint
+
+Usage: python benchmarks/load_test.py --base-url http://127.0.0.1:5000 \\
+           [--concurrency 8] [--rate 20] [--requests 200 | --duration 60] [--output report.json]
+
+Expressions such as ={{ $json.date }} come from upstream Code and Supabase
+nodes that are not replayed; they resolve from a context mirroring those
+nodes (tomorrow's date, type 'auto', 100 sample questions for /validate)
+and can be overridden with --context name=<json>. Split In Batches nodes
+only batch the Supabase inserts after our response, so they add no API calls.
+"""
+
+import argparse
+import glob
+import http.client
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_WORKFLOWS = os.path.join(ROOT, 'workflow_*.json')
+
+EXPRESSION = re.compile(r'^=\{\{\s*\$json\.([A-Za-z_][A-Za-z0-9_]*)\s*\}\}$')
+
+
+def default_context() -> Dict[str, Any]:
+    """Values the upstream n8n nodes would have produced"""
+    from question_generator import generate_questions_for_domain
+    return {
+        "date": (date.today() + timedelta(days=1)).isoformat(),
+        "type": "auto",
+        "stats": generate_questions_for_domain('quant', 100, 'intermediate', 'n8n_workflow', seed=1)
+    }
+
+
+def resolve(value: Any, context: Dict[str, Any]) -> Any:
+    """Replace a ={{ $json.name }} expression with its context value"""
+    if isinstance(value, str):
+        match = EXPRESSION.match(value)
+        if match:
+            name = match.group(1)
+            if name not in context:
+                raise KeyError(f"No context value for expression {value!r}; pass --context {name}=<json>")
+            return context[name]
+    return value
+
+
+class ReplayRequest:
+    """One HTTP Request node, ready to send"""
+
+    def __init__(self, workflow: str, node: str, method: str, path: str, headers: Dict[str, str], body: Optional[bytes]):
+        self.workflow = workflow
+        self.node = node
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+    @property
+    def label(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def load_requests(paths: List[str], context: Dict[str, Any]) -> List[ReplayRequest]:
+    """HTTP Request nodes from workflow files, with the host stripped off"""
+    requests = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        workflows = data.get('workflows', [data]) if isinstance(data, dict) else data
+        for workflow in workflows:
+            for node in workflow.get('nodes', []):
+                if not node.get('type', '').endswith('.httpRequest'):
+                    continue
+                params = node.get('parameters', {})
+                url = urlsplit(params['url'])
+                target = url.path + (f"?{url.query}" if url.query else '')
+                headers = {
+                    header['name']: str(resolve(header['value'], context))
+                    for header in params.get('headerParameters', {}).get('parameters', [])
+                }
+                body = None
+                if params.get('sendBody'):
+                    body = json.dumps({
+                        field['name']: resolve(field['value'], context)
+                        for field in params.get('bodyParameters', {}).get('parameters', [])
+                    }).encode('utf-8')
+                    headers.setdefault('Content-Type', 'application/json')
+                requests.append(ReplayRequest(workflow.get('name', os.path.basename(path)), node.get('name', ''),
+                                              params.get('method', 'GET'), target, headers, body))
+    return requests
+
+
+class Replayer:
+    """Sends requests from a thread pool with one keep-alive connection per thread"""
+
+    def __init__(self, base_url: str, timeout: float):
+        url = urlsplit(base_url)
+        self.https = url.scheme == 'https'
+        self.host = url.hostname
+        self.port = url.port or (443 if self.https else 80)
+        self.prefix = url.path.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            connection = self._local.connection = cls(self.host, self.port, timeout=self.timeout)
+        return connection
+
+    def send(self, request: ReplayRequest) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            connection = self._connection()
+            connection.request(request.method, self.prefix + request.path, body=request.body, headers=request.headers)
+            response = connection.getresponse()
+            size = len(response.read())
+            status = response.status
+            error = None if 200 <= status < 400 else f"HTTP {status}"
+        except (OSError, http.client.HTTPException) as e:
+            self._local.connection = None
+            status, size, error = None, 0, f"{type(e).__name__}: {e}"
+        return {"label": request.label, "seconds": time.perf_counter() - started,
+                "status": status, "bytes": size, "error": error}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarise(samples: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(sample['seconds'] for sample in samples)
+    errors: Dict[str, int] = {}
+    for sample in samples:
+        if sample['error']:
+            errors[sample['error']] = errors.get(sample['error'], 0) + 1
+    failed = sum(errors.values())
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        "requests": len(samples),
+        "errors": failed,
+        "error_rate": round(failed / len(samples), 4) if samples else 0.0,
+        "error_kinds": errors,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "bytes_received": sum(sample['bytes'] for sample in samples),
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p90_ms": ms(percentile(latencies, 0.90)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "max_ms": ms(latencies[-1] if latencies else None)
+    }
+
+
+def run(requests: List[ReplayRequest], replayer: Replayer, concurrency: int, rate: float,
+        total: Optional[int], duration: Optional[float]) -> Dict[str, Any]:
+    """Replay requests round-robin; with a rate, request i is released at i / rate seconds"""
+    samples: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+    counter = {"next": 0}
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    def worker() -> None:
+        while True:
+            with lock:
+                index = counter["next"]
+                if total is not None and index >= total:
+                    return
+                counter["next"] += 1
+            if rate > 0:
+                delay = started + index / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            sample = replayer.send(requests[index % len(requests)])
+            with lock:
+                samples.append(sample)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='wit-load') as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    by_label: Dict[str, List[Dict[str, Any]]] = {}
+    for sample in samples:
+        by_label.setdefault(sample['label'], []).append(sample)
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": summarise(samples, elapsed),
+        "endpoints": {label: summarise(items, elapsed) for label, items in sorted(by_label.items())}
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay the n8n workflows against a server")
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000', help='Server that replaces the Railway URL')
+    parser.add_argument('--workflows', nargs='*', help='Workflow files (default: workflow_*.json in the repo root)')
+    parser.add_argument('--only', help='Replay only requests whose path contains this text')
+    parser.add_argument('--concurrency', type=int, default=4, help='Requests in flight at once')
+    parser.add_argument('--rate', type=float, default=0, help='Requests per second across all workers (0: as fast as possible)')
+    parser.add_argument('--requests', type=int, help='Total requests to send (default: one pass if no --duration)')
+    parser.add_argument('--duration', type=float, help='Stop sending after this many seconds')
+    parser.add_argument('--timeout', type=float, default=300, help='Per-request timeout in seconds')
+    parser.add_argument('--context', action='append', default=[], metavar='NAME=JSON',
+                        help='Value for a ={{ $json.NAME }} expression')
+    parser.add_argument('--max-error-rate', type=float, help='Exit non-zero when the overall error rate exceeds this')
+    parser.add_argument('--output', help='Write the JSON report here as well as to stdout')
+    args = parser.parse_args()
+
+    context = default_context()
+    for item in args.context:
+        name, _, value = item.partition('=')
+        context[name] = json.loads(value)
+
+    paths = args.workflows or sorted(glob.glob(DEFAULT_WORKFLOWS))
+    requests = load_requests(paths, context)
+    if args.only:
+        requests = [request for request in requests if args.only in request.path]
+    if not requests:
+        parser.error("no HTTP Request nodes to replay")
+
+    total = args.requests
+    if total is None and args.duration is None:
+        total = len(requests)
+
+    for request in requests:
+        print(f"replaying {request.label:40} from {request.workflow} / {request.node}", file=sys.stderr)
+    report = run(requests, Replayer(args.base_url, args.timeout), args.concurrency, args.rate, total, args.duration)
+    report.update({
+        "created_at": datetime.now().isoformat(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "workflows": [os.path.basename(path) for path in paths]
+    })
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    if args.max_error_rate is not None and report['overall']['error_rate'] > args.max_error_rate:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Response Compression for Wit Content API
+Gzip/deflate negotiated from Accept-Encoding, including streamed responses
+"""
+
+import os
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import Flask, Response, request
+
+from timing import stage
+
+COMPRESSION_ENABLED = os.environ.get('WIT_COMPRESSION', '1').lower() not in ('0', 'false', 'no', 'off')
+COMPRESSION_LEVEL = int(os.environ.get('WIT_COMPRESSION_LEVEL', 6))
+
+# Buffered responses smaller than this are sent as-is
+COMPRESSION_MIN_SIZE = int(os.environ.get('WIT_COMPRESSION_MIN_SIZE', 1024))
+
+# Streamed responses are flushed to the client after this much input
+COMPRESSION_FLUSH_BYTES = int(os.environ.get('WIT_COMPRESSION_FLUSH_BYTES', 64 * 1024))
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/plain', 'text/html')
+
+# zlib wbits for each Content-Encoding: gzip wrapper, and the zlib wrapper HTTP calls deflate
+ENCODINGS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS
+}
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """Preferred supported encoding the client accepts, if any"""
+    best = None
+    best_quality = 0
+    for encoding in ENCODINGS:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compressor(encoding: str, level: int):
+    return zlib.compressobj(level, zlib.DEFLATED, ENCODINGS[encoding])
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, level: int = COMPRESSION_LEVEL,
+                    flush_bytes: int = COMPRESSION_FLUSH_BYTES) -> Iterator[bytes]:
+    """Compress chunks incrementally, sync-flushing so clients can decode early"""
+    compressor = _compressor(encoding, level)
+    pending = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= flush_bytes:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if data:
+            yield data
+    yield compressor.flush(zlib.Z_FINISH)
+
+
+def _weaken_etag(response: Response) -> None:
+    """Compressed bytes differ from the identity body, so the ETag becomes weak"""
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def compress_response(response: Response) -> Response:
+    """after_request hook applying the negotiated encoding"""
+    if not COMPRESSION_ENABLED:
+        return response
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return response
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.iter_encoded(), encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESSION_MIN_SIZE:
+            return response
+        with stage('compress'):
+            compressor = _compressor(encoding, COMPRESSION_LEVEL)
+            response.set_data(compressor.compress(body) + compressor.flush())
+
+    response.headers['Content-Encoding'] = encoding
+    _weaken_etag(response)
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    """Enable response compression on an app"""
+    app.after_request(compress_response)
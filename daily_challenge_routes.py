@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Cacheable Daily Challenge Endpoint for Wit Content API
+Challenges are a pure function of the date, so they carry strong ETags
+"""
+
+import hashlib
+import json
+import os
+from datetime import date
+from functools import lru_cache
+from typing import Tuple
+
+from flask import Blueprint, Response, request, jsonify
+
+from daily_challenges import CHALLENGE_CACHE_SIZE, challenge_type_for_date, parse_challenge_date, challenge_body
+
+# Cache lifetimes: past challenges never change, today's may still be revised
+CHALLENGE_MAX_AGE_PAST = int(os.environ.get('WIT_CHALLENGE_MAX_AGE_PAST', 31536000))
+CHALLENGE_MAX_AGE_TODAY = int(os.environ.get('WIT_CHALLENGE_MAX_AGE_TODAY', 300))
+
+daily_challenge_bp = Blueprint('daily_challenge', __name__)
+
+
+@lru_cache(maxsize=CHALLENGE_CACHE_SIZE)
+def _encoded_challenge(ordinal: int) -> Tuple[bytes, str]:
+    """Stable JSON body and strong ETag for a date"""
+    day = date.fromordinal(ordinal)
+    body = json.dumps({
+        "success": True,
+        "challenge": challenge_body(ordinal),
+        "date": day.isoformat(),
+        "type": challenge_type_for_date(day)
+    }, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return body, hashlib.sha256(body).hexdigest()[:32]
+
+
+@daily_challenge_bp.route('/daily-challenge/<target_date>', methods=['GET'])
+def get_daily_challenge(target_date: str):
+    """Daily challenge for a date, cacheable by clients and proxies"""
+    try:
+        day = parse_challenge_date(target_date)
+    except ValueError:
+        return jsonify({"error": "Date must be YYYY-MM-DD"}), 400
+
+    body, etag = _encoded_challenge(day.toordinal())
+
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    if day < date.today():
+        response.headers['Cache-Control'] = f'public, max-age={CHALLENGE_MAX_AGE_PAST}, immutable'
+    else:
+        response.headers['Cache-Control'] = f'public, max-age={CHALLENGE_MAX_AGE_TODAY}'
+
+    # Answers If-None-Match with a bodiless 304 when the ETag matches
+    return response.make_conditional(request)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Daily Challenge Generation for Wit Content API
+Challenge templates are built once; each date maps to one by day of year
+"""
+
+import os
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterator, Optional
+
+# Challenge type rotation, indexed by day_of_year % 5
+CHALLENGE_TYPES = (
+    'multi_step_quant',
+    'cross_domain_logic',
+    'pattern_recognition',
+    'data_analysis',
+    'spatial_reasoning'
+)
+
+# Dates kept in the per-date memo before least recently used ones are evicted
+CHALLENGE_CACHE_SIZE = int(os.environ.get('WIT_CHALLENGE_CACHE_SIZE', 4096))
+
+CHALLENGE_TEMPLATES = {
+    'multi_step_quant': {
+        "stem": "A train leaves Station A at 2:00 PM traveling 60 mph. Another train leaves Station B at 2:30 PM traveling 80 mph toward Station A. If the stations are 200 miles apart, at what time will they meet?",
+        "choices": ["3:15 PM", "3:30 PM", "3:45 PM", "4:00 PM"],
+        "answer": "3:30 PM",
+        "domain": "quant",
+        "difficulty": 1800,
+        "explanation": "This requires solving: 60(t) + 80(t-0.5) = 200. Solving gives t = 1.5 hours, so they meet at 3:30 PM."
+    },
+    'cross_domain_logic': {
+        "stem": "In a game tournament, players are ranked by their scores. Alice has a higher score than Bob, Bob has a higher score than Charlie, and David has a higher score than Alice. If exactly one of these statements is false, who has the highest score?",
+        "choices": ["Alice", "Bob", "Charlie", "David"],
+        "answer": "David",
+        "domain": "logic",
+        "difficulty": 1600,
+        "explanation": "If David > Alice > Bob > Charlie, then all statements are true. If David > Alice > Charlie > Bob, then 'Bob > Charlie' is false. David must have the highest score."
+    },
+    'pattern_recognition': {
+        "stem": "Complete the pattern: 2, 6, 12, 20, 30, 42, ___. What comes next?",
+        "choices": ["50", "56", "62", "68"],
+        "answer": "56",
+        "domain": "logic",
+        "difficulty": 1700,
+        "explanation": "The pattern adds consecutive even numbers: +4, +6, +8, +10, +12, +14. So 42 + 14 = 56."
+    },
+    'data_analysis': {
+        "stem": "A company's revenue for 5 years was: $100K, $120K, $150K, $180K, $220K. If this trend continues, what will the revenue be in year 7?",
+        "choices": ["$280K", "$300K", "$320K", "$340K"],
+        "answer": "$300K",
+        "domain": "data",
+        "difficulty": 1600,
+        "explanation": "The increases are: +20K, +30K, +30K, +40K. Following the pattern, year 6 would be +50K ($270K), year 7 would be +30K ($300K)."
+    },
+    'spatial_reasoning': {
+        "stem": "You start at point (0,0) and walk 3 units east, then 4 units north, then 3 units west, then 4 units south. How far are you from your starting point?",
+        "choices": ["0 units", "2 units", "4 units", "6 units"],
+        "answer": "0 units",
+        "domain": "spatial",
+        "difficulty": 1500,
+        "explanation": "You end up back at (0,0): (0,0) → (3,0) → (3,4) → (0,4) → (0,0). So you're 0 units from the start."
+    }
+}
+
+
+def parse_challenge_date(target_date: str) -> date:
+    """Parse a YYYY-MM-DD date"""
+    return datetime.strptime(target_date, '%Y-%m-%d').date()
+
+
+def challenge_type_for_date(day: date) -> str:
+    """Challenge type scheduled for a date"""
+    day_of_year = day.toordinal() - date(day.year, 1, 1).toordinal() + 1
+    return CHALLENGE_TYPES[day_of_year % len(CHALLENGE_TYPES)]
+
+
+@lru_cache(maxsize=CHALLENGE_CACHE_SIZE)
+def challenge_body(ordinal: int) -> Dict:
+    """Date-dependent part of a challenge, memoised per date
+
+    Callers must treat the returned dict as read-only.
+    """
+    day = date.fromordinal(ordinal)
+    challenge_type = challenge_type_for_date(day)
+    return {
+        **CHALLENGE_TEMPLATES[challenge_type],
+        "source": "daily_challenge",
+        "metadata": {
+            "is_daily_challenge": True,
+            "challenge_date": day.isoformat(),
+            "challenge_type": challenge_type
+        }
+    }
+
+
+def challenge_for_date(day: date, created_at: Optional[str] = None) -> Dict:
+    """Daily challenge for a date object"""
+    return {
+        **challenge_body(day.toordinal()),
+        "created_at": created_at or datetime.now().isoformat()
+    }
+
+
+def generate_daily_challenge_for_date(target_date: str, challenge_type: str) -> Dict:
+    """Generate a daily challenge for a specific date"""
+    return challenge_for_date(parse_challenge_date(target_date))
+
+
+def iter_challenge_range(start: date, end: date) -> Iterator[Dict]:
+    """Yield challenges for every date in [start, end] by ordinal arithmetic"""
+    created_at = datetime.now().isoformat()
+    for ordinal in range(start.toordinal(), end.toordinal() + 1):
+        yield {**challenge_body(ordinal), "created_at": created_at}
+
+
+def iter_daily_challenges(start_date: str, days: int) -> Iterator[Dict]:
+    """Yield consecutive daily challenges starting at start_date"""
+    start = parse_challenge_date(start_date)
+    if days <= 0:
+        return iter(())
+    return iter_challenge_range(start, start + timedelta(days=days - 1))
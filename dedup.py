@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Unique-Stem Bulk Generation for Wit Content API
+Keeps a hash set of normalised stems so a bulk run never repeats a question
+"""
+
+import hashlib
+import os
+import random
+import sys
+from typing import Any, Dict, Iterator, List, Optional
+
+from question_generator import bulk_slices, derive_seed, iter_questions_for_domain, new_seed
+
+# Consecutive duplicate candidates before a domain's variation space counts as exhausted
+DEDUP_MAX_STALL = int(os.environ.get('WIT_DEDUP_MAX_STALL', 1000))
+
+
+def stem_key(stem: str) -> bytes:
+    """Compact hash of a stem, ignoring case and whitespace differences"""
+    normalised = ' '.join(stem.lower().split())
+    return hashlib.blake2b(normalised.encode('utf-8'), digest_size=8).digest()
+
+
+def iter_unique_bulk_questions(domains: List[str], questions_per_domain: int, difficulty_distribution: Dict[str, float],
+                               source: str = 'bulk_generation', seed: Optional[int] = None,
+                               report: Optional[Dict[str, Any]] = None) -> Iterator[Dict]:
+    """Yield bulk questions whose stems are unique across the whole request
+
+    Each domain keeps one variation cursor across its difficulty slices and
+    keeps drawing variations until a slice is filled or DEDUP_MAX_STALL
+    candidates in a row are duplicates. report, when given, is filled with
+    the requested/generated counts, candidates tried and uniqueness ratio,
+    plus the domains whose variation space ran out.
+    """
+    if seed is None:
+        seed = new_seed()
+    if report is None:
+        report = {}
+
+    seen = set()
+    cursors: Dict[str, int] = {}
+    candidates = 0
+    by_domain: Dict[str, Dict[str, int]] = {}
+    exhausted = set()
+
+    for index, (domain, difficulty, count) in enumerate(bulk_slices(domains, questions_per_domain, difficulty_distribution)):
+        produced = stall = 0
+        start = cursors.get(domain, 0)
+        consumed = 0
+
+        if domain not in exhausted:
+            rng = random.Random(derive_seed(seed, index))
+            for question in iter_questions_for_domain(domain, sys.maxsize - start, difficulty, source, rng, start):
+                consumed += 1
+                key = stem_key(question['stem'])
+                if key in seen:
+                    stall += 1
+                    if stall >= DEDUP_MAX_STALL:
+                        break
+                    continue
+                seen.add(key)
+                stall = 0
+                produced += 1
+                yield question
+                if produced == count:
+                    break
+
+        cursors[domain] = start + consumed
+        candidates += consumed
+        totals = by_domain.setdefault(domain, {"requested": 0, "generated": 0})
+        totals["requested"] += count
+        totals["generated"] += produced
+        if produced < count:
+            exhausted.add(domain)
+
+    generated = sum(totals["generated"] for totals in by_domain.values())
+    report.update({
+        "requested": sum(totals["requested"] for totals in by_domain.values()),
+        "generated": generated,
+        "candidates": candidates,
+        "uniqueness_ratio": generated / candidates if candidates else 1.0,
+        "exhausted_domains": {domain: by_domain[domain] for domain in by_domain if domain in exhausted}
+    })
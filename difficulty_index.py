@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Difficulty Index for Wit Content API
+Per-domain questions sorted by numeric difficulty, for rating-based selection
+"""
+
+import math
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from heapq import merge
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from question_bank import get_question_bank
+from question_store import get_store
+
+# Half-width of the rating window when a request does not set one
+ADAPTIVE_WINDOW = int(os.environ.get('WIT_ADAPTIVE_WINDOW', 300))
+
+# How often a store-backed index picks up newly stored questions
+ADAPTIVE_REFRESH_SECONDS = float(os.environ.get('WIT_ADAPTIVE_REFRESH_SECONDS', 5))
+
+# Additions held in a small sorted side list before being merged into the main arrays
+COMPACT_SIZE = 10000
+
+# Weighted draws per requested question before falling back to the nearest ones
+SAMPLE_ATTEMPTS = 20
+
+
+class _DomainIndex:
+    """One domain's ids sorted by (difficulty, id), never mutated once built
+
+    keys/ids are compact parallel arrays; recent_keys/recent_ids hold
+    questions added since the last compaction. Updates build a new object
+    and swap it in, so readers need no lock.
+    """
+
+    __slots__ = ('keys', 'ids', 'recent_keys', 'recent_ids')
+
+    def __init__(self, keys: array, ids: array, recent_keys: List[int], recent_ids: List[int]):
+        self.keys = keys
+        self.ids = ids
+        self.recent_keys = recent_keys
+        self.recent_ids = recent_ids
+
+    @classmethod
+    def build(cls, pairs: List[Tuple[int, int]]) -> '_DomainIndex':
+        pairs.sort()
+        return cls(array('l', [key for key, _ in pairs]), array('q', [qid for _, qid in pairs]), [], [])
+
+    def __len__(self) -> int:
+        return len(self.keys) + len(self.recent_keys)
+
+    def add(self, pairs: List[Tuple[int, int]]) -> '_DomainIndex':
+        if len(self.recent_keys) + len(pairs) > COMPACT_SIZE:
+            # Timsort finds the existing sorted runs, so this is close to a linear merge
+            return self.build(list(zip(self.keys, self.ids)) + list(zip(self.recent_keys, self.recent_ids)) + pairs)
+        recent_keys, recent_ids = list(self.recent_keys), list(self.recent_ids)
+        for key, qid in sorted(pairs):
+            position = bisect_right(recent_keys, key)
+            recent_keys.insert(position, key)
+            recent_ids.insert(position, qid)
+        return _DomainIndex(self.keys, self.ids, recent_keys, recent_ids)
+
+    def tiers(self) -> Tuple[Tuple[Any, Any], ...]:
+        if self.recent_keys:
+            return (self.keys, self.ids), (self.recent_keys, self.recent_ids)
+        return ((self.keys, self.ids),)
+
+
+def _nearest(keys, ids, rating: int, low: float, high: float) -> Iterator[Tuple[int, int, int]]:
+    """(distance, id, difficulty) moving outward from rating, stopping at the window edges"""
+    right = bisect_left(keys, rating)
+    left = right - 1
+    size = len(keys)
+    while True:
+        below = rating - keys[left] if left >= 0 and keys[left] >= low else None
+        above = keys[right] - rating if right < size and keys[right] <= high else None
+        if above is not None and (below is None or above <= below):
+            yield above, ids[right], keys[right]
+            right += 1
+        elif below is not None:
+            yield below, ids[left], keys[left]
+            left -= 1
+        else:
+            return
+
+
+class DifficultyIndex:
+    """Sorted difficulty index over every domain
+
+    Lookups are a bisect plus a walk over only the questions they return,
+    so their cost does not grow with the number of questions indexed.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, str, int]] = ()):
+        self._domains: Dict[str, _DomainIndex] = {}
+        self._lock = threading.Lock()
+        self.last_id = 0
+        self.add(rows)
+
+    def __len__(self) -> int:
+        return sum(len(domain) for domain in self._domains.values())
+
+    def domains(self) -> List[str]:
+        return list(self._domains)
+
+    def add(self, rows: Iterable[Tuple[int, str, int]]) -> int:
+        """Index (id, domain, difficulty) rows, returning how many were added"""
+        grouped: Dict[str, List[Tuple[int, int]]] = {}
+        last_id = self.last_id
+        for question_id, domain, difficulty in rows:
+            grouped.setdefault(domain, []).append((int(difficulty), question_id))
+            last_id = max(last_id, question_id)
+        with self._lock:
+            for domain, pairs in grouped.items():
+                current = self._domains.get(domain)
+                self._domains[domain] = current.add(pairs) if current else _DomainIndex.build(pairs)
+            self.last_id = last_id
+        return sum(len(pairs) for pairs in grouped.values())
+
+    def nearest(self, domain: str, rating: int, count: int, window: Optional[int] = None,
+                exclude: Set[int] = frozenset()) -> List[Tuple[int, int, int]]:
+        """Up to count (distance, id, difficulty) closest to rating, nearest first"""
+        index = self._domains.get(domain)
+        if index is None or count <= 0:
+            return []
+        low, high = (rating - window, rating + window) if window is not None else (-math.inf, math.inf)
+        walks = [_nearest(keys, ids, rating, low, high) for keys, ids in index.tiers()]
+        picked = []
+        for candidate in (walks[0] if len(walks) == 1 else merge(*walks)):
+            if candidate[1] not in exclude:
+                picked.append(candidate)
+                if len(picked) >= count:
+                    break
+        return picked
+
+    def sample(self, domain: str, rating: int, count: int, spread: float, window: Optional[int] = None,
+               exclude: Set[int] = frozenset(), rng: Optional[random.Random] = None) -> List[Tuple[int, int, int]]:
+        """Up to count distinct questions drawn with Gaussian weight around rating
+
+        Each question in the window is equally likely to be proposed and is
+        accepted with weight exp(-d²/2σ²), so the result is an exact weighted
+        sample without touching the questions that are not drawn. Questions
+        still missing after the attempt budget come from nearest().
+        """
+        index = self._domains.get(domain)
+        if index is None or count <= 0:
+            return []
+        rng = rng or random.Random()
+        if window is None:
+            window = max(1, int(3 * spread))
+        ranges = [(keys, ids, bisect_left(keys, rating - window), bisect_right(keys, rating + window))
+                  for keys, ids in index.tiers()]
+        total = sum(stop - start for _, _, start, stop in ranges)
+
+        seen = set(exclude)
+        picked = []
+        attempts = count * SAMPLE_ATTEMPTS
+        while total and len(picked) < count and attempts:
+            attempts -= 1
+            offset = int(rng.random() * total)
+            for keys, ids, start, stop in ranges:
+                if offset < stop - start:
+                    break
+                offset -= stop - start
+            question_id, difficulty = ids[start + offset], keys[start + offset]
+            distance = abs(difficulty - rating)
+            if question_id in seen or rng.random() >= math.exp(-0.5 * (distance / spread) ** 2):
+                continue
+            seen.add(question_id)
+            picked.append((distance, question_id, difficulty))
+
+        if len(picked) < count:
+            picked.extend(self.nearest(domain, rating, count - len(picked), window, seen))
+        picked.sort()
+        return picked
+
+
+class QuestionSource(ABC):
+    """Difficulty index plus the questions it points at"""
+
+    name = ''
+
+    def __init__(self):
+        self.index = DifficultyIndex()
+
+    def refresh(self) -> None:
+        pass
+
+    @abstractmethod
+    def fetch(self, question_ids: List[int]) -> List[Dict[str, Any]]:
+        """Questions for index ids, in the order given"""
+
+
+class BankSource(QuestionSource):
+    """The question bank's templates, numbered 1.. in load order"""
+
+    name = 'question_bank'
+
+    def __init__(self):
+        super().__init__()
+        bank = get_question_bank()
+        self._templates = [template for domain in bank.domains() for template in bank.for_domain(domain)]
+        self.index.add((position + 1, template.domain, template.base_difficulty)
+                       for position, template in enumerate(self._templates))
+
+    def fetch(self, question_ids: List[int]) -> List[Dict[str, Any]]:
+        created_at = datetime.now().isoformat()
+        questions = []
+        for question_id in question_ids:
+            template = self._templates[question_id - 1]
+            questions.append({
+                "id": question_id,
+                "stem": template.stem,
+                "choices": list(template.choices),
+                "answer": template.answer,
+                "domain": template.domain,
+                "difficulty": template.base_difficulty,
+                "explanation": f"Explanation for {template.stem}",
+                "source": self.name,
+                "created_at": created_at
+            })
+        return questions
+
+
+class StoreSource(QuestionSource):
+    """Questions in the SQLite store, picking up new rows every few seconds"""
+
+    name = 'store'
+
+    def __init__(self, store, refresh_seconds: float = ADAPTIVE_REFRESH_SECONDS):
+        super().__init__()
+        self.store = store
+        self.refresh_seconds = refresh_seconds
+        self._refresh_lock = threading.Lock()
+        self._refreshed = 0.0
+        self.refresh()
+
+    def refresh(self) -> None:
+        if time.monotonic() - self._refreshed < self.refresh_seconds:
+            return
+        # One thread refreshes; the rest carry on with the index as it stands
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self.index.add(self.store.index_rows(self.index.last_id))
+            self._refreshed = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    def fetch(self, question_ids: List[int]) -> List[Dict[str, Any]]:
+        return self.store.get_many(question_ids)
+
+
+_source: Optional[QuestionSource] = None
+_source_lock = threading.Lock()
+
+
+def get_question_source() -> QuestionSource:
+    """Store-backed source when WIT_STORE_PATH is set, otherwise the question bank
+
+    Built on first use in each process, so a large store is never read
+    before a Gunicorn fork.
+    """
+    global _source
+    if _source is None:
+        with _source_lock:
+            if _source is None:
+                store = get_store()
+                _source = StoreSource(store) if store is not None else BankSource()
+    _source.refresh()
+    return _source
@@ -0,0 +1,46 @@
+"""
+Gunicorn Configuration for Wit Content API
+Gunicorn server used by Procfile and railway.json
+
+Usage: gunicorn -c gunicorn.conf.py simple_server:app
+Graceful reload: kill -HUP <master pid> restarts workers without dropping
+requests; with preload_app, deploy new code with kill -USR2 instead
+"""
+
+import multiprocessing
+import os
+
+# Railway sets PORT
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# One worker per core; jobs, /metrics and idempotency waits are shared through
+# DATA_DIR, so any worker can answer. WEB_CONCURRENCY is the conventional override.
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('WIT_THREADS', 4))
+worker_class = 'gthread'
+
+# Import the app, and with it the question bank and challenge templates, once
+# in the master so workers share them copy-on-write after fork
+preload_app = True
+
+# Long bulk requests need generous request timeouts; keep-alive lets n8n
+# reuse connections between Split In Batches requests
+timeout = int(os.environ.get('WIT_REQUEST_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('WIT_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('WIT_KEEPALIVE', 5))
+
+# Recycle workers periodically to cap memory growth, staggered by jitter
+max_requests = int(os.environ.get('WIT_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.environ.get('WIT_MAX_REQUESTS_JITTER', 500))
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('WIT_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    """Log the serving layout once the master is listening"""
+    server.log.info("Wit Content API ready: %s workers x %s threads on %s", workers, threads, bind)
+    if preload_app:
+        from startup import STARTUP
+        server.log.info("Startup: %s", STARTUP.summary())
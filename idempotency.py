@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Idempotent Bulk Requests for Wit Content API
+Retried bulk calls replay the first response's bytes instead of regenerating
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask, Response, g, request
+
+from compression import ENCODINGS
+from metrics import METRICS_ENABLED, inc
+from runtime_dir import DATA_DIR, pid_alive
+from request_params import parse_bulk_challenges_params, parse_bulk_questions_params
+from streaming import wants_ndjson
+
+IDEMPOTENCY_ENABLED = os.environ.get('WIT_IDEMPOTENCY', '1').lower() not in ('0', 'false', 'no', 'off')
+
+# How long a result can be replayed, in seconds
+IDEMPOTENCY_TTL = float(os.environ.get('WIT_IDEMPOTENCY_TTL', 86400))
+
+# In-memory LRU budget; bodies above the spill size are kept on disk only
+IDEMPOTENCY_MEMORY_BYTES = int(os.environ.get('WIT_IDEMPOTENCY_MEMORY_BYTES', 64 * 1024 * 1024))
+IDEMPOTENCY_SPILL_BYTES = int(os.environ.get('WIT_IDEMPOTENCY_SPILL_BYTES', 1024 * 1024))
+
+# Directory shared by every worker, so a retry landing on another worker still replays; empty disables it
+IDEMPOTENCY_DIR = os.environ.get('WIT_IDEMPOTENCY_DIR', os.path.join(DATA_DIR, 'idempotency_cache'))
+IDEMPOTENCY_DISK_BYTES = int(os.environ.get('WIT_IDEMPOTENCY_DISK_BYTES', 1024 * 1024 * 1024))
+
+# How long a retry waits for the original request when it is still running, in this worker or another
+IDEMPOTENCY_WAIT = float(os.environ.get('WIT_IDEMPOTENCY_WAIT', 300))
+
+# How often a retry checks on an original that another worker is running
+CLAIM_POLL_SECONDS = 0.25
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+# Routes whose results are cached, with the parser that normalises their bodies
+IDEMPOTENT_ROUTES = {
+    '/generate-bulk-questions': parse_bulk_questions_params,
+    '/generate-daily-challenges-bulk': parse_bulk_challenges_params,
+    '/generate-batch': None,
+}
+
+# Disk usage is re-scanned at most this often, or sooner once writes pass the cap
+SWEEP_SECONDS = 60
+
+# Headers added by later hooks or recomputed on replay
+UNCACHED_HEADERS = frozenset(('content-length', 'server-timing', 'date', 'set-cookie'))
+
+
+def _digest(*parts: Any) -> str:
+    canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+    return hashlib.sha256(canonical).hexdigest()
+
+
+class CachedResponse:
+    """Status, headers and body bytes of a finished response"""
+
+    __slots__ = ('fingerprint', 'status', 'headers', 'body', 'expires_at')
+
+    def __init__(self, fingerprint: str, status: int, headers: List[Tuple[str, str]], body: bytes, expires_at: float):
+        self.fingerprint = fingerprint
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.expires_at = expires_at
+
+    def to_response(self) -> Response:
+        response = Response(self.body, status=self.status, headers=self.headers)
+        encoding = response.headers.get('Content-Encoding')
+        if encoding in ENCODINGS and request.accept_encodings[encoding] <= 0:
+            # Stored compressed, but this client did not ask for that encoding
+            response.set_data(zlib.decompress(self.body, ENCODINGS[encoding]))
+            del response.headers['Content-Encoding']
+        response.headers[REPLAYED_HEADER] = 'true'
+        return response
+
+
+class ResultCache:
+    """Bounded in-memory LRU with a size-capped on-disk tier
+
+    Every result is written to disk when a directory is configured; those
+    at or under the spill size also stay in memory. Expired entries are
+    dropped when read and when the disk tier is swept.
+    """
+
+    def __init__(self, directory: Optional[str] = IDEMPOTENCY_DIR, memory_bytes: int = IDEMPOTENCY_MEMORY_BYTES,
+                 spill_bytes: int = IDEMPOTENCY_SPILL_BYTES, disk_bytes: int = IDEMPOTENCY_DISK_BYTES):
+        self.directory = directory or None
+        self.memory_bytes = memory_bytes
+        self.spill_bytes = spill_bytes
+        self.disk_bytes = disk_bytes
+        self._entries: 'OrderedDict[str, CachedResponse]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._written_since_sweep = 0
+        self._swept = 0.0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.entry")
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    return entry
+                self._forget(key)
+        entry = self._read(key) if self.directory else None
+        if entry is not None:
+            # Written by another worker, or pushed out of this one's memory
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        if self.directory:
+            self._write(key, entry)
+        self._remember(key, entry)
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        if len(entry.body) > self.spill_bytes:
+            return
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while self._size > self.memory_bytes and self._entries:
+                self._forget(next(iter(self._entries)))
+
+    def _forget(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.body)
+
+    def _read(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                meta = json.loads(f.readline())
+                if meta['expires_at'] <= time.time():
+                    entry = None
+                else:
+                    entry = CachedResponse(meta['fingerprint'], meta['status'],
+                                           [tuple(header) for header in meta['headers']], f.read(), meta['expires_at'])
+        except (OSError, ValueError, KeyError):
+            return None
+        if entry is None:
+            self._remove(self._path(key))
+        return entry
+
+    def _write(self, key: str, entry: CachedResponse) -> None:
+        meta = {"fingerprint": entry.fingerprint, "status": entry.status,
+                "headers": entry.headers, "expires_at": entry.expires_at}
+        tmp = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, 'wb') as f:
+                f.write(json.dumps(meta).encode('utf-8') + b'\n')
+                f.write(entry.body)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            self._remove(tmp)
+            return
+        with self._lock:
+            self._written_since_sweep += len(entry.body)
+            due = (self._written_since_sweep > self.disk_bytes // 10
+                   or time.monotonic() - self._swept > SWEEP_SECONDS)
+            if due:
+                self._written_since_sweep = 0
+                self._swept = time.monotonic()
+        if due:
+            self.sweep()
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def sweep(self) -> None:
+        """Delete expired disk entries, then the oldest until under the size cap"""
+        if not self.directory:
+            return
+        now = time.time()
+        files = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for item in entries:
+                    if item.name.endswith('.entry'):
+                        stat = item.stat()
+                        files.append((stat.st_mtime, stat.st_size, item.path))
+        except OSError:
+            return
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if total <= self.disk_bytes and mtime + IDEMPOTENCY_TTL > now:
+                continue
+            self._remove(path)
+            total -= size
+
+
+RESULTS = ResultCache()
+
+_in_flight: Dict[str, threading.Event] = {}
+_in_flight_lock = threading.Lock()
+
+
+def _claim_path(key: str) -> str:
+    return os.path.join(RESULTS.directory, f"{key}.claim")
+
+
+def _claim_file(key: str) -> bool:
+    """Create the claim file other workers wait on; False while a live request holds it
+
+    A claim left by a process that died, or older than the wait, is taken over.
+    Call under _in_flight_lock.
+    Without a cache directory, or if it cannot be written, claims stay per process.
+    """
+    if not RESULTS.directory:
+        return True
+    path = _claim_path(key)
+    for _ in range(2):
+        try:
+            os.makedirs(RESULTS.directory, exist_ok=True)
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    owner = int(f.read() or 0)
+                stale = time.time() - os.path.getmtime(path) > IDEMPOTENCY_WAIT
+            except (OSError, ValueError):
+                # Being written or removed right now
+                return False
+            # No pid yet means the owner is between creating and writing it; our own pid here is a leftover
+            if not stale and (not owner or (owner != os.getpid() and pid_alive(owner))):
+                return False
+            ResultCache._remove(path)
+            continue
+        except OSError:
+            return True
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def _claimed_elsewhere(key: str) -> bool:
+    return bool(RESULTS.directory) and os.path.exists(_claim_path(key))
+
+
+def _record(result: str) -> None:
+    if METRICS_ENABLED:
+        inc('wit_idempotency_total', (('result', result),))
+
+
+def _request_key() -> Optional[Tuple[str, str]]:
+    """(cache key, body fingerprint) for a cacheable request, or None
+
+    An Idempotency-Key header names the result. Without one, a body that
+    fully determines its result (an explicit seed or cursor, or challenges,
+    which depend only on dates) is keyed by its normalised form.
+    """
+    rule = request.url_rule.rule if request.url_rule is not None else None
+    if request.method != 'POST' or rule not in IDEMPOTENT_ROUTES or wants_ndjson(request):
+        return None
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None
+    header = request.headers.get(IDEMPOTENCY_HEADER)
+    if header:
+        return _digest(rule, 'header', header), _digest(data)
+
+    normalise = IDEMPOTENT_ROUTES[rule]
+    determined = data.get('seed') not in (None, '') or data.get('cursor') or rule == '/generate-daily-challenges-bulk'
+    if normalise is None or not determined:
+        return None
+    try:
+        params = normalise(data)
+    except (TypeError, ValueError):
+        return None
+    if data.get('seed') in (None, ''):
+        # A cursor carries its own seed; the fresh one drawn for an unseeded body must not enter the key
+        params.pop('seed', None)
+    key = _digest(rule, 'body', params)
+    return key, key
+
+
+def _conflict() -> Response:
+    _record('conflict')
+    return Response(json.dumps({"error": f"{IDEMPOTENCY_HEADER} was already used with a different request body"}),
+                    status=422, mimetype='application/json')
+
+
+def _replay_or_claim() -> Optional[Response]:
+    """before_request hook: replay a stored result, or mark this request as the one producing it"""
+    request_key = _request_key()
+    if request_key is None:
+        return None
+    key, fingerprint = request_key
+
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT
+    while True:
+        entry = RESULTS.get(key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                return _conflict()
+            _record('replayed')
+            return entry.to_response()
+
+        with _in_flight_lock:
+            running = _in_flight.get(key)
+            if running is None and _claim_file(key):
+                _in_flight[key] = threading.Event()
+                g.idempotency = (key, fingerprint)
+                return None
+
+        # The original is still being generated; wait rather than do it twice
+        remaining = deadline - time.monotonic()
+        if running is not None:
+            finished = remaining > 0 and running.wait(remaining)
+        else:
+            # Another worker holds the claim; poll until it stores a result or lets go
+            while remaining > 0 and _claimed_elsewhere(key) and RESULTS.get(key) is None:
+                time.sleep(min(CLAIM_POLL_SECONDS, remaining))
+                remaining = deadline - time.monotonic()
+            finished = remaining > 0
+        if not finished:
+            _record('in_progress')
+            return Response(json.dumps({"error": "A request with the same key is still in progress; retry later"}),
+                            status=409, mimetype='application/json', headers={'Retry-After': '5'})
+
+
+def _store(response: Response) -> Response:
+    """after_request hook: keep successful buffered results for replay"""
+    claim = g.get('idempotency')
+    if claim is None or response.status_code != 200 or response.is_streamed or response.direct_passthrough:
+        return response
+    key, fingerprint = claim
+    headers = [(name, value) for name, value in response.headers.items() if name.lower() not in UNCACHED_HEADERS]
+    RESULTS.put(key, CachedResponse(fingerprint, response.status_code, headers, response.get_data(),
+                                    time.time() + IDEMPOTENCY_TTL))
+    _record('stored')
+    return response
+
+
+def _release(exc: Optional[BaseException]) -> None:
+    """teardown hook: wake any retries waiting on this request, stored or not"""
+    claim = g.pop('idempotency', None)
+    if claim is None:
+        return
+    with _in_flight_lock:
+        event = _in_flight.pop(claim[0], None)
+        if RESULTS.directory:
+            ResultCache._remove(_claim_path(claim[0]))
+    if event is not None:
+        event.set()
+
+
+def init_idempotency(app: Flask) -> None:
+    """Replay results of repeated bulk requests on an app
+
+    Register after init_timing and before init_compression: after_request
+    hooks run in reverse, so the stored bytes are the compressed ones the
+    client received.
+    """
+    if not IDEMPOTENCY_ENABLED:
+        return
+    app.before_request(_replay_or_claim)
+    app.after_request(_store)
+    app.teardown_request(_release)
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Background Job API for Wit Content Generation
+Runs bulk question and challenge generation outside the request cycle
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from flask import Blueprint, request, jsonify
+
+from daily_challenges import iter_daily_challenges
+from dedup import iter_unique_bulk_questions
+from progress_stats import counted_challenges, counted_questions
+from question_generator import bulk_slices, iter_bulk_questions
+from question_store import require_store
+from request_params import json_object, parse_bulk_questions_params, parse_bulk_challenges_params
+from runtime_dir import DATA_DIR, pid_alive
+from serialization import dumps, envelope_response
+
+# Concurrency limits so one huge request cannot starve the rest of the API
+JOB_WORKERS = int(os.environ.get('WIT_JOB_WORKERS', 2))
+JOB_MAX_PENDING = int(os.environ.get('WIT_JOB_MAX_PENDING', 8))
+JOB_HISTORY = int(os.environ.get('WIT_JOB_HISTORY', 100))
+
+# Items held across every job's stored results, finished or still running
+JOB_MAX_RESULT_ITEMS = int(os.environ.get('WIT_JOB_MAX_RESULT_ITEMS', 1000000))
+
+# Job status and results live in SQLite so any worker process can answer for any job
+JOBS_PATH = os.environ.get('WIT_JOBS_PATH', os.path.join(DATA_DIR, 'wit_jobs.db'))
+
+# Results written per transaction; cancellation is checked between writes
+JOB_FLUSH_SIZE = 1000
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        done INTEGER NOT NULL DEFAULT 0,
+        params TEXT NOT NULL,
+        error TEXT,
+        pid INTEGER NOT NULL,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL
+    )""",
+    "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)",
+    """CREATE TABLE IF NOT EXISTS job_results (
+        job_id TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        item BLOB NOT NULL,
+        PRIMARY KEY (job_id, position)
+    ) WITHOUT ROWID""",
+)
+
+COLUMNS = "id, kind, status, total, done, params, error, pid, created_at, started_at, finished_at"
+
+PENDING = f"status NOT IN ({', '.join(repr(state) for state in FINISHED_STATES)})"
+
+
+class Job:
+    """A single background generation run, as last recorded"""
+
+    def __init__(self, row: Tuple):
+        (self.id, self.kind, self.status, self.total, self.done, params, self.error, self.pid,
+         self.created_at, self.started_at, self.finished_at) = row
+        self.params = json.loads(params)
+
+    def progress(self) -> Dict[str, Any]:
+        """Status document with items done/total, rate and ETA"""
+        rate = None
+        eta_seconds = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+            if elapsed > 0 and self.done:
+                rate = self.done / elapsed
+                if self.status == RUNNING:
+                    eta_seconds = (self.total - self.done) / rate
+
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "progress": self.done / self.total if self.total else 1.0,
+            "rate_per_second": rate,
+            "eta_seconds": eta_seconds,
+            "error": self.error,
+            "params": self.params
+        }
+
+
+class JobStore:
+    """SQLite registry of jobs and their results, shared by every worker process
+
+    Each thread of each process gets its own connection. Admission runs in
+    an IMMEDIATE transaction, so the pending and result limits hold across
+    workers.
+    """
+
+    def __init__(self, path: str = JOBS_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._schema_pid: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so they are keyed by pid as well as thread
+        if getattr(self._local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if self._schema_pid != os.getpid():
+                for statement in SCHEMA:
+                    connection.execute(statement)
+                self._schema_pid = os.getpid()
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _transaction(self, work: Callable[[sqlite3.Connection], Any]) -> Any:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(connection)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return result
+
+    @staticmethod
+    def _finish(connection: sqlite3.Connection, job_id: str, status: str, error: Optional[str] = None) -> None:
+        connection.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                           (status, error, time.time(), job_id))
+        if status == COMPLETED:
+            # A unique run can finish short of what was requested
+            connection.execute("UPDATE jobs SET total = done WHERE id = ?", (job_id,))
+        else:
+            # Only completed jobs serve results
+            connection.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+
+    def _reap(self, connection: sqlite3.Connection, local: frozenset) -> None:
+        """Fail unfinished jobs whose worker process has gone, e.g. after a restart"""
+        for job_id, pid in connection.execute(f"SELECT id, pid FROM jobs WHERE {PENDING}").fetchall():
+            if job_id not in local and (pid == os.getpid() or not pid_alive(pid)):
+                self._finish(connection, job_id, FAILED, "Worker process exited before the job finished")
+
+    def create(self, kind: str, total: int, params: Dict[str, Any], max_pending: int, history: int,
+               max_items: int, local: frozenset) -> Optional[Job]:
+        """Record a queued job, or return None when the pending or result limit is reached"""
+        def admit(connection: sqlite3.Connection) -> Optional[Job]:
+            self._reap(connection, local)
+            if connection.execute(f"SELECT COUNT(*) FROM jobs WHERE {PENDING}").fetchone()[0] >= max_pending:
+                return None
+            # Pending jobs reserve their full total; finished ones hold what they stored
+            held = connection.execute(
+                f"SELECT COALESCE(SUM(CASE WHEN {PENDING} THEN total ELSE done END), 0) FROM jobs"
+            ).fetchone()[0]
+            finished = connection.execute(
+                f"SELECT id, done FROM jobs WHERE NOT {PENDING} ORDER BY created_at"
+            ).fetchall()
+            jobs = connection.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            evict = []
+            for job_id, done in finished:
+                if jobs < history and held + total <= max_items:
+                    break
+                evict.append((job_id,))
+                jobs -= 1
+                held -= done
+            if held + total > max_items:
+                return None
+            connection.executemany("DELETE FROM job_results WHERE job_id = ?", evict)
+            connection.executemany("DELETE FROM jobs WHERE id = ?", evict)
+            row = (uuid.uuid4().hex, kind, QUEUED, total, 0, dumps(params).decode('utf-8'), None, os.getpid(),
+                   time.time(), None, None)
+            connection.execute(f"INSERT INTO jobs ({COLUMNS}) VALUES ({', '.join('?' * len(row))})", row)
+            return Job(row)
+
+        return self._transaction(admit)
+
+    def get(self, job_id: str, local: frozenset) -> Optional[Job]:
+        select = lambda connection: connection.execute(f"SELECT {COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        row = select(self._connection())
+        if row is None:
+            return None
+        job = Job(row)
+        if job.status not in FINISHED_STATES and job.id not in local and (job.pid == os.getpid() or not pid_alive(job.pid)):
+            def reap(connection: sqlite3.Connection) -> Tuple:
+                self._reap(connection, local)
+                return select(connection)
+            job = Job(self._transaction(reap))
+        return job
+
+    def request_cancel(self, job_id: str) -> None:
+        self._connection().execute(f"UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND {PENDING}", (job_id,))
+
+    def start(self, job_id: str) -> bool:
+        """Mark a job running, or finish it as cancelled if that was requested while queued"""
+        def begin(connection: sqlite3.Connection) -> bool:
+            if connection.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]:
+                self._finish(connection, job_id, CANCELLED)
+                return False
+            connection.execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ?", (RUNNING, time.time(), job_id))
+            return True
+
+        return self._transaction(begin)
+
+    def append(self, job_id: str, done: int, items: List[bytes]) -> bool:
+        """Store the next results, or finish the job as cancelled and return False"""
+        def write(connection: sqlite3.Connection) -> bool:
+            if connection.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]:
+                self._finish(connection, job_id, CANCELLED)
+                return False
+            connection.executemany("INSERT INTO job_results (job_id, position, item) VALUES (?, ?, ?)",
+                                   [(job_id, done + offset, item) for offset, item in enumerate(items)])
+            connection.execute("UPDATE jobs SET done = ? WHERE id = ?", (done + len(items), job_id))
+            return True
+
+        return self._transaction(write)
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        self._transaction(lambda connection: self._finish(connection, job_id, status, error))
+
+    def results(self, job_id: str, start: int, count: int) -> List[bytes]:
+        rows = self._connection().execute(
+            "SELECT item FROM job_results WHERE job_id = ? AND position >= ? AND position < ? ORDER BY position",
+            (job_id, start, start + count)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+class JobManager:
+    """Bounded executor plus the shared job registry"""
+
+    def __init__(self, workers: int = JOB_WORKERS, max_pending: int = JOB_MAX_PENDING, history: int = JOB_HISTORY,
+                 max_items: int = JOB_MAX_RESULT_ITEMS, path: str = JOBS_PATH):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='wit-job')
+        self.max_pending = max_pending
+        self.history = history
+        self.max_items = max_items
+        self.store = JobStore(path)
+        # Ids of unfinished jobs this process is responsible for
+        self.local = set()
+        self.lock = threading.Lock()
+
+    def _local(self) -> frozenset:
+        with self.lock:
+            return frozenset(self.local)
+
+    def submit(self, kind: str, total: int, params: Dict[str, Any], items: Callable[[], Iterator[Dict]]) -> Optional[Job]:
+        """Queue a job, or return None when the pending or result limit is reached"""
+        with self.lock:
+            job = self.store.create(kind, total, params, self.max_pending, self.history, self.max_items,
+                                    frozenset(self.local))
+            if job is None:
+                return None
+            self.local.add(job.id)
+
+        self.executor.submit(self._run, job.id, items)
+        return job
+
+    def _run(self, job_id: str, items: Callable[[], Iterator[Dict]]) -> None:
+        """Consume a generator, storing results until done or cancelled"""
+        try:
+            if not self.store.start(job_id):
+                return
+            done = 0
+            batch: List[bytes] = []
+            for item in items():
+                batch.append(dumps(item))
+                if len(batch) >= JOB_FLUSH_SIZE:
+                    if not self.store.append(job_id, done, batch):
+                        return
+                    done += len(batch)
+                    batch = []
+            if batch and not self.store.append(job_id, done, batch):
+                return
+            self.store.finish(job_id, COMPLETED)
+        except Exception as e:
+            self.store.finish(job_id, FAILED, str(e))
+        finally:
+            with self.lock:
+                self.local.discard(job_id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id, self._local())
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Ask a queued or running job to stop; whichever worker runs it sees the request"""
+        self.store.request_cancel(job_id)
+        return self.get(job_id)
+
+
+job_manager = JobManager()
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+def _accepted(job: Optional[Job]):
+    """202 response for a queued job, 429 when the queue or result storage is full"""
+    if job is None:
+        return jsonify({"error": "Too many pending jobs or stored results, retry later"}), 429
+    return jsonify({
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "total": job.total,
+        "status_url": f"/jobs/{job.id}",
+        "results_url": f"/jobs/{job.id}/results"
+    }), 202
+
+
+def _check_total(total: int) -> None:
+    if total > JOB_MAX_RESULT_ITEMS:
+        raise ValueError(f"At most {JOB_MAX_RESULT_ITEMS} items per job")
+
+
+@jobs_bp.route('/jobs/bulk-questions', methods=['POST'])
+def submit_bulk_questions_job():
+    """Start a background /generate-bulk-questions run"""
+    try:
+        # Everything that can be rejected is rejected here, not inside the job
+        try:
+            params = parse_bulk_questions_params(json_object(request))
+            slices = bulk_slices(params['domains'], params['questions_per_domain'], params['difficulty_distribution'])
+            total = sum(count for _, _, count in slices)
+            _check_total(total)
+            store = require_store() if params['store'] else None
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        def items() -> Iterator[Dict]:
+            # Same generators as /generate-bulk-questions; a unique run may finish short of total
+            if params['unique']:
+                questions = iter_unique_bulk_questions(params['domains'], params['questions_per_domain'],
+                                                       params['difficulty_distribution'], seed=params['seed'])
+            else:
+                questions = iter_bulk_questions(params['domains'], params['questions_per_domain'],
+                                                params['difficulty_distribution'], seed=params['seed'])
+            if store is not None:
+                questions = store.tee(questions)
+            return counted_questions(questions)
+
+        return _accepted(job_manager.submit('bulk_questions', total, params, items))
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@jobs_bp.route('/jobs/daily-challenges-bulk', methods=['POST'])
+def submit_daily_challenges_job():
+    """Start a background /generate-daily-challenges-bulk run"""
+    try:
+        try:
+            params = parse_bulk_challenges_params(json_object(request))
+            _check_total(params['days'])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        job = job_manager.submit('daily_challenges_bulk', max(0, params['days']), params, lambda: counted_challenges(iter_daily_challenges(
+            params['start_date'], params['days']
+        )))
+        return _accepted(job)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id: str):
+    """Report progress for a job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.progress())
+
+
+@jobs_bp.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.progress())
+
+
+@jobs_bp.route('/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id: str):
+    """Fetch a page of results from a completed job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job.status != COMPLETED:
+        return jsonify({"error": f"Job is {job.status}", "status": job.status}), 409
+
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+        page_size = min(MAX_PAGE_SIZE, max(1, int(request.args.get('page_size', DEFAULT_PAGE_SIZE))))
+    except ValueError:
+        return jsonify({"error": "page and page_size must be integers"}), 400
+
+    start = (page - 1) * page_size
+    # Results are stored encoded, so a page is spliced together without decoding
+    items = job_manager.store.results(job.id, start, page_size)
+    has_more = start + page_size < job.done
+
+    return envelope_response({
+        "success": True,
+        "job_id": job.id,
+        "count": len(items),
+        "page": page,
+        "page_size": page_size,
+        "total_count": job.done,
+        "next_page": page + 1 if has_more else None
+    }, "items", b'[' + b','.join(items) + b']')
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Prometheus Metrics for Wit Content API
+Counters live in per-thread shards so the hot path never takes a lock
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from flask import Blueprint, Flask, Response, g, request
+
+from question_bank import difficulty_band
+from runtime_dir import DATA_DIR, pid_alive
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Collection is cheap enough to leave on; 0 turns the hooks into no-ops
+METRICS_ENABLED = os.environ.get('WIT_METRICS', '1').lower() not in ('0', 'false', 'no', 'off')
+
+# Each process snapshots its totals here so /metrics on any worker covers them all; empty keeps them per process
+METRICS_DIR = os.environ.get('WIT_METRICS_DIR', os.path.join(DATA_DIR, 'metrics'))
+METRICS_SNAPSHOT_SECONDS = float(os.environ.get('WIT_METRICS_SNAPSHOT_SECONDS', 5))
+
+# Counters of processes that have exited are folded into this file
+EXITED_FILE = 'exited.json'
+
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'wit_http_requests_total': ('counter', 'HTTP requests by route, method and status', None),
+    'wit_http_requests_in_flight': ('gauge', 'HTTP requests currently being served', None),
+    'wit_http_request_duration_seconds': ('histogram', 'Time from request start until the response is fully sent', LATENCY_BUCKETS),
+    'wit_http_response_size_bytes': ('histogram', 'Response body bytes as sent, after compression', SIZE_BUCKETS),
+    'wit_request_stage_seconds': ('histogram', 'Time spent in each request stage (parse, generate, serialise, compress, send)', LATENCY_BUCKETS),
+    'wit_questions_generated_total': ('counter', 'Questions generated by domain and difficulty band', None),
+    'wit_challenges_generated_total': ('counter', 'Daily challenges generated by challenge type', None),
+    'wit_validations_total': ('counter', 'Questions checked by /validate by result', None),
+    'wit_idempotency_total': ('counter', 'Cacheable bulk requests by outcome (stored, replayed, conflict, in_progress)', None),
+}
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+class _Shard:
+    """One thread's share of every metric; only that thread writes to it"""
+
+    __slots__ = ('values', 'histograms')
+
+    def __init__(self):
+        self.values: Dict[LabelKey, float] = {}
+        # Per bucket counts (not cumulative) followed by the overflow bucket, sum and count
+        self.histograms: Dict[LabelKey, List[float]] = {}
+
+
+_shards: List[_Shard] = []
+_shards_lock = threading.Lock()
+_local = threading.local()
+
+# Counts from threads that have exited, so request threads do not leave a shard each behind
+_retired = _Shard()
+
+
+def _add_shard(into: _Shard, shard: _Shard) -> None:
+    """Add one shard's counts to another; dict() and list() copies are atomic under the GIL"""
+    for key, value in dict(shard.values).items():
+        into.values[key] = into.values.get(key, 0) + value
+    for key, row in dict(shard.histograms).items():
+        total = into.histograms.get(key)
+        into.histograms[key] = list(row) if total is None else [a + b for a, b in zip(total, row)]
+
+
+def _retire(shard: _Shard) -> None:
+    """Fold an exited thread's shard into the retired totals"""
+    with _shards_lock:
+        if shard not in _shards:
+            # Inherited across a fork and already dropped
+            return
+        _shards.remove(shard)
+        _add_shard(_retired, shard)
+
+
+def _forked() -> None:
+    """Start a forked worker from zero; the parent reports its own counts"""
+    global _shards, _local, _retired
+    _shards, _local, _retired = [], threading.local(), _Shard()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forked)
+
+
+def _shard() -> _Shard:
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        with _shards_lock:
+            _shards.append(shard)
+        # Runs once the thread has finished and been released; the shard has no other writer by then
+        weakref.finalize(threading.current_thread(), _retire, shard)
+        _ensure_writer()
+    return shard
+
+
+def inc(name: str, labels: Tuple[Tuple[str, str], ...] = (), amount: float = 1) -> None:
+    """Add to a counter or gauge"""
+    values = _shard().values
+    key = (name, labels)
+    values[key] = values.get(key, 0) + amount
+
+
+def observe(name: str, labels: Tuple[Tuple[str, str], ...], value: float) -> None:
+    """Record one histogram observation"""
+    histograms = _shard().histograms
+    key = (name, labels)
+    row = histograms.get(key)
+    buckets = METRICS[name][2]
+    if row is None:
+        row = histograms[key] = [0] * (len(buckets) + 3)
+    row[bisect_left(buckets, value)] += 1
+    row[-2] += value
+    row[-1] += 1
+
+
+def record_request(route: str, method: str, status: int, seconds: float, size: Optional[int]) -> None:
+    """Record a finished request"""
+    if not METRICS_ENABLED:
+        return
+    labels = (('route', route), ('method', method))
+    inc('wit_http_requests_total', labels + (('status', str(status)),))
+    observe('wit_http_request_duration_seconds', labels, seconds)
+    if size is not None:
+        observe('wit_http_response_size_bytes', labels, size)
+
+
+def record_stages(route: str, stages: Dict[str, float]) -> None:
+    """Record the per-stage durations of a finished request"""
+    if not METRICS_ENABLED:
+        return
+    for stage_name, seconds in stages.items():
+        observe('wit_request_stage_seconds', (('route', route), ('stage', stage_name)), seconds)
+
+
+def track_in_flight(amount: int) -> None:
+    if METRICS_ENABLED:
+        inc('wit_http_requests_in_flight', (), amount)
+
+
+def record_questions(domain: str, difficulty: str, count: int) -> None:
+    # Only known bands become labels, so clients cannot mint new series
+    if METRICS_ENABLED and count:
+        inc('wit_questions_generated_total', (('domain', domain), ('difficulty', difficulty_band(difficulty))), count)
+
+
+def record_challenges(challenges: Iterable[Dict]) -> None:
+    """Record a finished list of challenges by type"""
+    if not METRICS_ENABLED:
+        return
+    for challenge_type, count in Counter(c['metadata']['challenge_type'] for c in challenges).items():
+        inc('wit_challenges_generated_total', (('challenge_type', challenge_type),), count)
+
+
+def record_validation(valid: int, invalid: int) -> None:
+    if METRICS_ENABLED:
+        inc('wit_validations_total', (('result', 'valid'),), valid)
+        inc('wit_validations_total', (('result', 'invalid'),), invalid)
+
+
+def _collect() -> Tuple[Dict[LabelKey, float], Dict[LabelKey, List[float]]]:
+    """Sum the retired totals and every live shard"""
+    total = _Shard()
+    with _shards_lock:
+        _add_shard(total, _retired)
+        shards = list(_shards)
+    for shard in shards:
+        _add_shard(total, shard)
+    return total.values, total.histograms
+
+
+def _dumps(shard: _Shard) -> str:
+    return json.dumps({
+        "values": [[name, labels, value] for (name, labels), value in shard.values.items()],
+        "histograms": [[name, labels, row] for (name, labels), row in shard.histograms.items()]
+    })
+
+
+def _load(path: str) -> Optional[_Shard]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        shard = _Shard()
+        for name, labels, value in data['values']:
+            shard.values[(name, tuple(tuple(pair) for pair in labels))] = value
+        for name, labels, row in data['histograms']:
+            shard.histograms[(name, tuple(tuple(pair) for pair in labels))] = row
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return shard
+
+
+def _write(path: str, shard: _Shard) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(_dumps(shard))
+    os.replace(tmp, path)
+
+
+class _DirLock:
+    """Exclusive lock over METRICS_DIR while exited snapshots are folded"""
+
+    def __enter__(self):
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        self._file = open(os.path.join(METRICS_DIR, '.lock'), 'a', encoding='utf-8')
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        self._file.close()
+
+
+def _fold_exited(path: str, shard: _Shard) -> None:
+    """Add a gone process's counters to the exited totals and drop its file; call under _DirLock
+
+    Its gauges described requests it was serving, so they are not kept.
+    """
+    counters = _Shard()
+    counters.values = {key: value for key, value in shard.values.items() if METRICS.get(key[0], ('counter',))[0] != 'gauge'}
+    counters.histograms = shard.histograms
+    exited_path = os.path.join(METRICS_DIR, EXITED_FILE)
+    exited = _load(exited_path) or _Shard()
+    _add_shard(exited, counters)
+    _write(exited_path, exited)
+    os.remove(path)
+
+
+def _snapshot_pid(name: str) -> Optional[int]:
+    """pid a snapshot file belongs to, or None for any other file"""
+    stem, ext = os.path.splitext(name)
+    return int(stem) if ext == '.json' and stem.isdigit() else None
+
+
+def _snapshot_path() -> str:
+    return os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+
+
+def snapshot() -> None:
+    """Write this process's totals for the other workers' /metrics"""
+    if not METRICS_DIR or _writer_pid != os.getpid():
+        return
+    values, histograms = _collect()
+    total = _Shard()
+    total.values, total.histograms = values, histograms
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        _write(_snapshot_path(), total)
+    except OSError:
+        pass
+
+
+_writer_pid: Optional[int] = None
+_writer_lock = threading.Lock()
+
+
+def _ensure_writer() -> None:
+    """Start the snapshot thread in this process; forked workers start their own"""
+    global _writer_pid
+    if not METRICS_DIR or _writer_pid == os.getpid():
+        return
+    with _writer_lock:
+        if _writer_pid == os.getpid():
+            return
+        _writer_pid = os.getpid()
+    # A file under this pid is left over from an earlier process that had it
+    try:
+        with _DirLock():
+            stale = _load(_snapshot_path())
+            if stale is not None:
+                _fold_exited(_snapshot_path(), stale)
+    except OSError:
+        pass
+    threading.Thread(target=_snapshot_loop, name='wit-metrics', daemon=True).start()
+
+
+def _snapshot_loop() -> None:
+    while True:
+        time.sleep(METRICS_SNAPSHOT_SECONDS)
+        snapshot()
+
+
+# Leave final counts behind when a worker exits cleanly
+atexit.register(snapshot)
+
+
+def _collect_all() -> Tuple[Dict[LabelKey, float], Dict[LabelKey, List[float]]]:
+    """This process's live totals plus every other process's last snapshot"""
+    total = _Shard()
+    total.values, total.histograms = _collect()
+    if not METRICS_DIR:
+        return total.values, total.histograms
+    try:
+        with _DirLock():
+            names = os.listdir(METRICS_DIR)
+            # Fold exited processes first, so their counters are read back from the exited totals
+            for name in names:
+                pid = _snapshot_pid(name)
+                if pid is not None and pid != os.getpid() and not pid_alive(pid):
+                    path = os.path.join(METRICS_DIR, name)
+                    shard = _load(path)
+                    if shard is not None:
+                        _fold_exited(path, shard)
+            for name in os.listdir(METRICS_DIR):
+                pid = _snapshot_pid(name)
+                if name == EXITED_FILE or (pid is not None and pid != os.getpid()):
+                    shard = _load(os.path.join(METRICS_DIR, name))
+                    if shard is not None:
+                        _add_shard(total, shard)
+    except OSError:
+        pass
+    return total.values, total.histograms
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of every metric, summed across worker processes"""
+    values, histograms = _collect_all()
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if buckets is None:
+            series = sorted((labels, value) for (metric, labels), value in values.items() if metric == name)
+            if not series and kind == 'gauge':
+                series = [((), 0)]
+            for labels, value in series:
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+            continue
+        for labels, row in sorted((labels, row) for (metric, labels), row in histograms.items() if metric == name):
+            cumulative = 0
+            for bound, count in zip(buckets, row):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, (('le', _number(bound)),))} {_number(cumulative)}")
+            lines.append(f"{name}_bucket{_labels(labels, (('le', '+Inf'),))} {_number(row[-1])}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(row[-2])}")
+            lines.append(f"{name}_count{_labels(labels)} {_number(row[-1])}")
+    return '\n'.join(lines) + '\n'
+
+
+def _counting(chunks: Iterable[bytes], sent: List[int]) -> Iterator[bytes]:
+    for chunk in chunks:
+        sent[0] += len(chunk)
+        yield chunk
+
+
+def _start_request() -> None:
+    g.metrics_started = time.perf_counter()
+    track_in_flight(1)
+
+
+def _finish_request(response: Response) -> Response:
+    """Record once the body has been sent, so streamed responses count in full"""
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    method = request.method
+    status = response.status_code
+
+    if response.is_streamed:
+        sent = [0]
+        response.response = _counting(response.response, sent)
+        size = lambda: sent[0]
+    else:
+        length = response.calculate_content_length()
+        size = lambda: length
+
+    def record():
+        track_in_flight(-1)
+        record_request(route, method, status, time.perf_counter() - started, size())
+
+    response.call_on_close(record)
+    return response
+
+
+def init_metrics(app: Flask) -> None:
+    """Instrument every request on an app
+
+    Register before init_compression: after_request hooks run in reverse,
+    so this one sees the compressed body.
+    """
+    if not METRICS_ENABLED:
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint for every worker process"""
+    return Response(render_metrics(), content_type=PROMETHEUS_MIMETYPE)
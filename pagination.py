@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Bulk Pagination for Wit Content API
+Opaque cursors that let each page of a bulk response be generated on its own
+"""
+
+import base64
+import hashlib
+import json
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from daily_challenges import iter_challenge_range, parse_challenge_date
+from question_generator import bulk_slices, iter_slice_questions
+from serialization import dumps
+
+CURSOR_VERSION = 1
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """Short digest of the parameters that shape a bulk run"""
+    canonical = json.dumps(parts, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(canonical, digest_size=6).hexdigest()
+
+
+def encode_cursor(fingerprint: str, **position: int) -> str:
+    """URL-safe cursor carrying a position and the fingerprint of the run it belongs to"""
+    payload = dumps({"v": CURSOR_VERSION, "f": fingerprint, **position})
+    return base64.urlsafe_b64encode(payload).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor: str, fingerprint: str, *fields: str) -> Tuple[int, ...]:
+    """Integer position fields of a cursor, or ValueError if it is malformed or from another run"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if data['v'] != CURSOR_VERSION or any(type(data[field]) is not int or data[field] < 0 for field in fields):
+            raise ValueError
+        owner = data['f']
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+    if owner != fingerprint:
+        raise ValueError("Cursor belongs to a different request; send the same body as for the first page")
+    return tuple(data[field] for field in fields)
+
+
+def bulk_questions_page(params: Dict[str, Any]) -> Dict[str, Any]:
+    """One page of a /generate-bulk-questions run
+
+    The cursor holds (seed, slice, offset), so a page costs the same however
+    deep it is, the same cursor always yields the same questions, and the
+    pages in order match the unpaged response for that seed.
+    """
+    domains, per_domain, distribution = params['domains'], params['questions_per_domain'], params['difficulty_distribution']
+    slices = bulk_slices(domains, per_domain, distribution)
+    fingerprint = request_fingerprint(domains, per_domain, distribution)
+
+    if params['cursor']:
+        seed, slice_index, offset = decode_cursor(params['cursor'], fingerprint, 'seed', 'slice', 'offset')
+        if slice_index >= len(slices) or offset >= slices[slice_index][2]:
+            raise ValueError("Invalid cursor")
+    else:
+        seed, slice_index, offset = params['seed'], 0, 0
+
+    questions: List[Dict[str, Any]] = []
+    counted: List[tuple] = []
+    remaining = params['page_size']
+    while remaining and slice_index < len(slices):
+        domain, difficulty, count = slices[slice_index]
+        take = min(remaining, count - offset)
+        questions.extend(iter_slice_questions(domain, difficulty, slice_index, seed, offset, take))
+        counted.append((domain, difficulty, take))
+        remaining -= take
+        offset += take
+        if offset >= count:
+            slice_index, offset = slice_index + 1, 0
+
+    next_cursor: Optional[str] = None
+    if slice_index < len(slices):
+        next_cursor = encode_cursor(fingerprint, seed=seed, slice=slice_index, offset=offset)
+    return {
+        "questions": questions,
+        "slices": counted,
+        "seed": seed,
+        "total_count": sum(count for _, _, count in slices),
+        "next_cursor": next_cursor
+    }
+
+
+def daily_challenges_page(params: Dict[str, Any]) -> Dict[str, Any]:
+    """One page of a /generate-daily-challenges-bulk run; the cursor holds the day offset"""
+    start_date, days = params['start_date'], params['days']
+    fingerprint = request_fingerprint(start_date, days)
+
+    offset = 0
+    if params['cursor']:
+        offset, = decode_cursor(params['cursor'], fingerprint, 'offset')
+        if offset >= days:
+            raise ValueError("Invalid cursor")
+
+    take = max(0, min(params['page_size'], days - offset))
+    first = parse_challenge_date(start_date) + timedelta(days=offset)
+    challenges = list(iter_challenge_range(first, first + timedelta(days=take - 1))) if take else []
+
+    next_cursor: Optional[str] = None
+    if offset + take < days:
+        next_cursor = encode_cursor(fingerprint, offset=offset + take)
+    return {
+        "challenges": challenges,
+        "total_count": max(0, days),
+        "next_cursor": next_cursor
+    }
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Parallel Bulk Generation for Wit Content API
+Fans bulk work units out to a process pool, falling back to threads
+"""
+
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import partial
+from typing import Dict, List, Optional
+
+from question_batch import QuestionBatch, generate_chunk_batch
+from question_generator import bulk_chunks, new_seed
+
+PARALLEL_WORKERS = int(os.environ.get('WIT_PARALLEL_WORKERS', os.cpu_count() or 1))
+
+# Requests smaller than this are cheaper to generate serially
+PARALLEL_MIN_ITEMS = int(os.environ.get('WIT_PARALLEL_MIN_ITEMS', 20000))
+
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+
+def _make_pool(workers: int) -> Executor:
+    """Process pool when the platform allows it, thread pool otherwise"""
+    try:
+        return ProcessPoolExecutor(max_workers=workers)
+    except (OSError, NotImplementedError, ImportError):
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='wit-parallel')
+
+
+def get_pool() -> Executor:
+    """Shared pool, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _make_pool(PARALLEL_WORKERS)
+        return _pool
+
+
+def _fall_back_to_threads() -> Executor:
+    """Replace a broken process pool with a thread pool"""
+    global _pool
+    with _pool_lock:
+        if not isinstance(_pool, ThreadPoolExecutor):
+            _pool = ThreadPoolExecutor(max_workers=PARALLEL_WORKERS, thread_name_prefix='wit-parallel')
+        return _pool
+
+
+def recover_pool(broken: Executor) -> Executor:
+    """Replace a process pool whose worker died, unless another request already has"""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            broken.shutdown(wait=False)
+            _pool = _make_pool(PARALLEL_WORKERS)
+        return _pool
+
+
+def generate_bulk_batches_parallel(domains: List[str], questions_per_domain: int,
+                                   difficulty_distribution: Dict[str, float],
+                                   source: str = 'bulk_generation', seed: Optional[int] = None) -> List[QuestionBatch]:
+    """Generate a bulk request across workers, merged in serial order
+
+    Every work unit carries its own derived seed, so the output matches
+    iter_bulk_questions for the same seed. Workers return columnar batches,
+    which pickle far smaller than lists of dicts.
+    """
+    if seed is None:
+        seed = new_seed()
+    chunks = bulk_chunks(domains, questions_per_domain, difficulty_distribution, seed)
+    work = partial(generate_chunk_batch, source=source, created_at=datetime.now().isoformat())
+
+    try:
+        return list(get_pool().map(work, chunks))
+    except (BrokenProcessPool, OSError):
+        return list(_fall_back_to_threads().map(work, chunks))
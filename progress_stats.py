@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Progress Statistics for Wit Content API
+Running counts of generated content, kept incrementally and snapshotted to disk
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from flask import Blueprint, jsonify
+
+import metrics
+from question_bank import DIFFICULTY_BANDS, difficulty_band
+from runtime_dir import DATA_DIR
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Snapshot file shared by every worker process; empty disables snapshots
+STATS_PATH = os.environ.get('WIT_STATS_PATH', os.path.join(DATA_DIR, 'wit_stats.json'))
+STATS_SNAPSHOT_SECONDS = float(os.environ.get('WIT_STATS_SNAPSHOT_SECONDS', 60))
+
+# Regular questions needed to reach the content goal
+STATS_GOAL = int(os.environ.get('WIT_STATS_GOAL', 10000))
+
+stats_bp = Blueprint('stats', __name__)
+
+
+def _empty() -> Dict[str, Any]:
+    return {
+        "total": 0,
+        "by_domain": {},
+        "by_source": {},
+        "by_difficulty": {},
+        "daily_challenges": 0,
+        "regular_questions": 0,
+        "validation": {"valid": 0, "invalid": 0}
+    }
+
+
+def _merge(into: Dict[str, Any], counts: Dict[str, Any]) -> Dict[str, Any]:
+    """Add nested counts into another set of counts"""
+    for key, value in counts.items():
+        if isinstance(value, dict):
+            _merge(into.setdefault(key, {}), value)
+        else:
+            into[key] = into.get(key, 0) + value
+    return into
+
+
+def band_for(difficulty: int) -> str:
+    """Named band containing a numeric difficulty"""
+    for band, (low, high) in DIFFICULTY_BANDS.items():
+        if low <= difficulty <= high:
+            return band
+    return 'other'
+
+
+class ProgressStats:
+    """Counts by domain, source, difficulty band and daily vs regular
+
+    Each process counts into a pending delta. A snapshot adds the delta to
+    the file under an exclusive lock and adopts the file's totals, so
+    workers sharing one file never overwrite each other's counts.
+    """
+
+    def __init__(self, path: Optional[str] = STATS_PATH, interval: float = STATS_SNAPSHOT_SECONDS):
+        self.path = path or None
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._base = self._read()
+        self._delta = _empty()
+        self._snapshot_at: Optional[str] = None
+        self._writer_pid: Optional[int] = None
+
+    def _read(self) -> Dict[str, Any]:
+        if not self.path or not os.path.exists(self.path):
+            return _empty()
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return _merge(_empty(), json.load(f).get('stats', {}))
+        except (OSError, ValueError):
+            return _empty()
+
+    def _add(self, domain: str, band: str, source: str, count: int, daily: bool) -> None:
+        with self._lock:
+            delta = self._delta
+            delta['total'] += count
+            delta['by_domain'][domain] = delta['by_domain'].get(domain, 0) + count
+            delta['by_source'][source] = delta['by_source'].get(source, 0) + count
+            delta['by_difficulty'][band] = delta['by_difficulty'].get(band, 0) + count
+            delta['daily_challenges' if daily else 'regular_questions'] += count
+        self._ensure_writer()
+
+    def add_questions(self, domain: str, band: str, source: str, count: int) -> None:
+        if count:
+            self._add(domain, band, source, count, False)
+
+    def add_challenges(self, challenges: Iterable[Dict[str, Any]]) -> None:
+        groups = Counter(
+            (challenge['domain'], band_for(challenge['difficulty']), challenge.get('source', 'daily_challenge'))
+            for challenge in challenges
+        )
+        for (domain, band, source), count in groups.items():
+            self._add(domain, band, source, count, True)
+
+    def add_validation(self, valid: int, invalid: int) -> None:
+        with self._lock:
+            self._delta['validation']['valid'] += valid
+            self._delta['validation']['invalid'] += invalid
+        self._ensure_writer()
+
+    def counts(self) -> Dict[str, Any]:
+        with self._lock:
+            return _merge(_merge(_empty(), self._base), self._delta)
+
+    def snapshot(self) -> None:
+        """Fold pending counts into the snapshot file"""
+        if not self.path:
+            return
+        with self._lock:
+            delta, self._delta = self._delta, _empty()
+        if delta == _empty():
+            # Nothing new here; just pick up what other workers have written
+            totals = self._read()
+            with self._lock:
+                self._base = totals
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # The snapshot itself is replaced atomically, so the lock lives in a side file
+            with open(f"{self.path}.lock", 'a', encoding='utf-8') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                totals = _merge(self._read(), delta)
+                snapshot_at = datetime.now().isoformat()
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump({"stats": totals, "snapshot_at": snapshot_at}, f)
+                os.replace(tmp, self.path)
+        except OSError:
+            # Keep the counts for the next attempt
+            with self._lock:
+                _merge(self._delta, delta)
+            return
+        with self._lock:
+            self._base = totals
+            self._snapshot_at = snapshot_at
+
+    def _ensure_writer(self) -> None:
+        """Start the snapshot thread in this process; forked workers start their own"""
+        if not self.path or self._writer_pid == os.getpid():
+            return
+        with self._lock:
+            if self._writer_pid == os.getpid():
+                return
+            self._writer_pid = os.getpid()
+        threading.Thread(target=self._snapshot_loop, name='wit-stats', daemon=True).start()
+
+    def _snapshot_loop(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.snapshot()
+
+    def report(self) -> Dict[str, Any]:
+        """The Progress Monitor workflow's numbers plus difficulty and validation counts"""
+        stats = self.counts()
+        progress = stats['regular_questions'] / STATS_GOAL * 100 if STATS_GOAL else 100.0
+        return {
+            "stats": stats,
+            "progress_percentage": round(progress, 2),
+            "remaining_questions": STATS_GOAL - stats['regular_questions'],
+            "goal": STATS_GOAL,
+            "timestamp": datetime.now().isoformat(),
+            "snapshot_at": self._snapshot_at
+        }
+
+
+STATS = ProgressStats()
+
+# Flush whatever the last interval counted when a worker exits cleanly
+atexit.register(STATS.snapshot)
+
+
+def record_questions(domain: str, difficulty: str, source: str, count: int) -> None:
+    """Count generated questions in the progress stats and /metrics"""
+    STATS.add_questions(domain, difficulty_band(difficulty), source, count)
+    metrics.record_questions(domain, difficulty, count)
+
+
+def record_question_slices(slices: Iterable[tuple], source: str = 'bulk_generation') -> None:
+    """Record (domain, difficulty, count) slices from bulk_slices"""
+    for domain, difficulty, count in slices:
+        record_questions(domain, difficulty, source, count)
+
+
+def counted_questions(questions: Iterable[Dict]) -> Iterator[Dict]:
+    """Pass questions through, recording each one as it is produced
+
+    Consecutive questions with the same domain, band and source are
+    recorded together, and whatever was yielded is recorded when the
+    consumer stops, so an aborted stream or a cancelled job counts only
+    what it produced.
+    """
+    key = None
+    low = high = 0
+    count = 0
+    try:
+        for question in questions:
+            difficulty = question['difficulty']
+            if key is None or not low <= difficulty <= high or question['domain'] != key[0] or question['source'] != key[2]:
+                if count:
+                    record_questions(key[0], key[1], key[2], count)
+                band = band_for(difficulty)
+                low, high = DIFFICULTY_BANDS.get(band, (difficulty, difficulty))
+                key, count = (question['domain'], band, question['source']), 0
+            count += 1
+            yield question
+    finally:
+        if count:
+            record_questions(key[0], key[1], key[2], count)
+
+
+def record_challenges(challenges: Iterable[Dict]) -> None:
+    challenges = list(challenges)
+    STATS.add_challenges(challenges)
+    metrics.record_challenges(challenges)
+
+
+def counted_challenges(challenges: Iterable[Dict]) -> Iterator[Dict]:
+    """Pass challenges through, recording each as it is produced"""
+    for challenge in challenges:
+        record_challenges((challenge,))
+        yield challenge
+
+
+def record_validation(valid: int, invalid: int) -> None:
+    STATS.add_validation(valid, invalid)
+    metrics.record_validation(valid, invalid)
+
+
+@stats_bp.route('/stats', methods=['GET'])
+def get_stats():
+    """Progress toward the content goal, in constant time"""
+    return jsonify(STATS.report())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Question Bank for Wit Content Generation
+Templates are built once, on first use or at warm-up, and indexed by domain and difficulty
+"""
+
+import json
+import os
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Difficulty bands used by every generation endpoint
+DIFFICULTY_BANDS = {
+    'basic': (400, 600),
+    'intermediate': (700, 1000),
+    'advanced': (1100, 1400),
+    'expert': (1500, 2000)
+}
+
+DEFAULT_DIFFICULTY_BAND = 'intermediate'
+
+
+def difficulty_band(difficulty_range: str) -> str:
+    """Known band name for a requested range; generation treats anything else as the default band"""
+    return difficulty_range if difficulty_range in DIFFICULTY_BANDS else DEFAULT_DIFFICULTY_BAND
+
+# Optional JSON/JSONL file that replaces the built-in templates
+QUESTION_BANK_PATH = os.environ.get('WIT_QUESTION_BANK_PATH')
+
+
+class QuestionTemplate(NamedTuple):
+    """Immutable question template"""
+    domain: str
+    stem: str
+    choices: Tuple[str, ...]
+    answer: str
+    base_difficulty: int
+
+
+# Built-in templates per domain: (stem, choices, answer, base_difficulty)
+BUILTIN_TEMPLATES = {
+    'quant': [
+        ("What is 25% of 80?", ["15", "20", "25", "30"], "20", 600),
+        ("If a rectangle has length 8 and width 6, what is its area?", ["14", "28", "48", "56"], "48", 700),
+        ("What is 15% of 200?", ["20", "25", "30", "35"], "30", 600),
+        ("If 3x + 5 = 20, what is x?", ["3", "5", "7", "15"], "5", 800),
+        ("What is the square root of 64?", ["6", "7", "8", "9"], "8", 600),
+        ("What is 2^5?", ["16", "32", "64", "128"], "32", 700),
+        ("If a circle has radius 5, what is its area?", ["25π", "50π", "75π", "100π"], "25π", 900),
+        ("What is the slope of the line y = 2x + 3?", ["1", "2", "3", "5"], "2", 800),
+        ("What is 1/3 + 1/6?", ["1/2", "1/3", "1/6", "2/9"], "1/2", 700),
+        ("If a triangle has angles 30°, 60°, and 90°, what type is it?", ["Equilateral", "Isosceles", "Right", "Obtuse"], "Right", 600),
+    ],
+    'verbal': [
+        ("What is the opposite of 'generous'?", ["kind", "stingy", "friendly", "helpful"], "stingy", 500),
+        ("Complete the analogy: Hot is to Cold as Light is to ___", ["Bright", "Dark", "Warm", "Shine"], "Dark", 800),
+        ("What is a synonym for 'happy'?", ["sad", "joyful", "angry", "tired"], "joyful", 400),
+        ("What is the opposite of 'brave'?", ["strong", "cowardly", "smart", "fast"], "cowardly", 500),
+        ("Complete the analogy: Dog is to Puppy as Cat is to ___", ["Kitten", "Baby", "Young", "Small"], "Kitten", 600),
+        ("What is a synonym for 'big'?", ["small", "large", "tiny", "little"], "large", 400),
+        ("Complete the analogy: Book is to Read as Movie is to ___", ["Watch", "See", "Look", "View"], "Watch", 600),
+        ("What is the opposite of 'fast'?", ["quick", "slow", "rapid", "speedy"], "slow", 400),
+        ("What is a synonym for 'smart'?", ["dumb", "intelligent", "stupid", "foolish"], "intelligent", 500),
+        ("Complete the analogy: Teacher is to Student as Doctor is to ___", ["Nurse", "Patient", "Hospital", "Medicine"], "Patient", 700),
+    ],
+    'spatial': [
+        ("If you face north and turn right twice, which direction are you facing?", ["North", "South", "East", "West"], "South", 600),
+        ("You walk 3 blocks east, then 2 blocks north. How far are you from your starting point?", ["3 blocks", "4 blocks", "5 blocks", "6 blocks"], "5 blocks", 1000),
+        ("If you turn left from facing west, which direction are you facing?", ["North", "South", "East", "West"], "South", 500),
+        ("You walk 4 blocks south, then 3 blocks west. How far are you from your starting point?", ["5 blocks", "6 blocks", "7 blocks", "8 blocks"], "5 blocks", 900),
+        ("If you face east and turn right three times, which direction are you facing?", ["North", "South", "East", "West"], "North", 700),
+        ("You walk 6 blocks north, then 8 blocks east. How far are you from your starting point?", ["10 blocks", "12 blocks", "14 blocks", "16 blocks"], "10 blocks", 1100),
+        ("If you turn right from facing south, which direction are you facing?", ["North", "South", "East", "West"], "West", 500),
+        ("You walk 5 blocks west, then 12 blocks north. How far are you from your starting point?", ["13 blocks", "15 blocks", "17 blocks", "19 blocks"], "13 blocks", 1200),
+        ("If you face north and turn left twice, which direction are you facing?", ["North", "South", "East", "West"], "South", 600),
+        ("You walk 9 blocks east, then 12 blocks south. How far are you from your starting point?", ["15 blocks", "18 blocks", "21 blocks", "24 blocks"], "15 blocks", 1300),
+    ],
+    'logic': [
+        ("Complete the sequence: 2, 4, 8, 16, ___", ["20", "24", "32", "30"], "32", 900),
+        ("If all birds can fly and a penguin is a bird, what can be concluded?", ["Penguins can fly", "Penguins cannot fly", "No conclusion can be drawn", "Some birds cannot fly"], "No conclusion can be drawn", 1200),
+        ("What comes next: 1, 3, 6, 10, ___", ["12", "15", "16", "18"], "15", 800),
+        ("If all students study and John is a student, what can be concluded?", ["John studies", "John does not study", "No conclusion can be drawn", "Some students don't study"], "John studies", 1000),
+        ("Complete the sequence: 1, 2, 4, 7, 11, ___", ["14", "15", "16", "17"], "16", 1000),
+        ("If all mammals have hair and a whale is a mammal, what can be concluded?", ["Whales have hair", "Whales don't have hair", "No conclusion can be drawn", "Some mammals don't have hair"], "Whales have hair", 900),
+        ("What comes next: 3, 6, 12, 24, ___", ["36", "48", "30", "42"], "48", 800),
+        ("If all cars have wheels and this is a car, what can be concluded?", ["This has wheels", "This doesn't have wheels", "No conclusion can be drawn", "Some cars don't have wheels"], "This has wheels", 700),
+        ("Complete the sequence: 1, 4, 9, 16, ___", ["20", "25", "30", "35"], "25", 900),
+        ("If all doctors are smart and Sarah is a doctor, what can be concluded?", ["Sarah is smart", "Sarah is not smart", "No conclusion can be drawn", "Some doctors are not smart"], "Sarah is smart", 800),
+    ],
+    'data': [
+        ("In a survey of 100 people, 60 prefer apples and 40 prefer oranges. What percentage prefer apples?", ["40%", "50%", "60%", "70%"], "60%", 500),
+        ("If a company's revenue increased from $1000 to $1200, what was the percentage increase?", ["15%", "20%", "25%", "30%"], "20%", 800),
+        ("In a class of 25 students, 15 are boys. What is the ratio of boys to girls?", ["3:2", "2:3", "3:5", "5:3"], "3:2", 700),
+        ("If a basketball player scores 20, 25, and 15 points in three games, what was their average?", ["18", "20", "22", "25"], "20", 600),
+        ("In a survey of 200 people, 120 own a car and 80 don't. What percentage don't own a car?", ["30%", "35%", "40%", "45%"], "40%", 600),
+        ("If a stock price increases from $50 to $60, what is the percentage increase?", ["15%", "20%", "25%", "30%"], "20%", 700),
+        ("In a group of 80 people, 32 are women. What percentage are men?", ["40%", "50%", "60%", "70%"], "60%", 600),
+        ("If a test has 40 questions and you get 32 correct, what is your percentage score?", ["70%", "75%", "80%", "85%"], "80%", 600),
+        ("In a survey of 150 people, 90 support a policy and 60 oppose it. What is the ratio of supporters to opponents?", ["2:1", "3:2", "4:3", "5:3"], "3:2", 700),
+        ("If a company's profit increased from $5000 to $7000, what was the percentage increase?", ["30%", "35%", "40%", "45%"], "40%", 800),
+    ]
+}
+
+
+def make_template(domain: str, stem: str, choices: Iterable[str], answer: str, base_difficulty: int) -> QuestionTemplate:
+    """Build a compact template, interning strings shared across templates"""
+    return QuestionTemplate(
+        sys.intern(domain),
+        stem,
+        tuple(sys.intern(str(choice)) for choice in choices),
+        sys.intern(str(answer)),
+        int(base_difficulty)
+    )
+
+
+class QuestionBank:
+    """Immutable question templates indexed by domain and difficulty"""
+
+    __slots__ = ('_by_domain', '_sorted', '_sorted_keys', '_by_band', '_size')
+
+    def __init__(self, templates: Iterable[QuestionTemplate]):
+        by_domain: Dict[str, List[QuestionTemplate]] = {}
+        for template in templates:
+            by_domain.setdefault(template.domain, []).append(template)
+
+        # Insertion order is kept per domain so generation stays stable
+        self._by_domain = {domain: tuple(items) for domain, items in by_domain.items()}
+        self._sorted = {}
+        self._sorted_keys = {}
+        self._by_band = {}
+        self._size = 0
+
+        for domain, items in self._by_domain.items():
+            ordered = tuple(sorted(items, key=lambda t: t.base_difficulty))
+            keys = tuple(t.base_difficulty for t in ordered)
+            self._sorted[domain] = ordered
+            self._sorted_keys[domain] = keys
+            self._size += len(items)
+            for band, (min_diff, max_diff) in DIFFICULTY_BANDS.items():
+                self._by_band[(domain, band)] = ordered[bisect_left(keys, min_diff):bisect_right(keys, max_diff)]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def domains(self) -> List[str]:
+        """Domains present in the bank"""
+        return list(self._by_domain)
+
+    def for_domain(self, domain: str) -> Tuple[QuestionTemplate, ...]:
+        """All templates for a domain in load order"""
+        return self._by_domain.get(domain, ())
+
+    def for_band(self, domain: str, band: str) -> Tuple[QuestionTemplate, ...]:
+        """Templates whose base difficulty falls inside a named band"""
+        return self._by_band.get((domain, band), ())
+
+    def in_range(self, domain: str, min_diff: int, max_diff: int) -> Tuple[QuestionTemplate, ...]:
+        """Templates whose base difficulty lies in [min_diff, max_diff]"""
+        keys = self._sorted_keys.get(domain)
+        if not keys:
+            return ()
+        return self._sorted[domain][bisect_left(keys, min_diff):bisect_right(keys, max_diff)]
+
+    def summary(self) -> Dict[str, Any]:
+        """Template counts per domain and band"""
+        return {
+            "total": self._size,
+            "domains": {
+                domain: {
+                    "total": len(items),
+                    "bands": {band: len(self._by_band[(domain, band)]) for band in DIFFICULTY_BANDS}
+                }
+                for domain, items in self._by_domain.items()
+            }
+        }
+
+
+def _template_from_record(record: Dict[str, Any], domain: Optional[str] = None) -> QuestionTemplate:
+    """Build a template from a JSON record"""
+    return make_template(
+        record.get('domain', domain),
+        record['stem'],
+        record['choices'],
+        record['answer'],
+        record.get('base_difficulty', record.get('difficulty'))
+    )
+
+
+def load_templates(path: str) -> List[QuestionTemplate]:
+    """Load templates from a JSON or JSONL file
+
+    JSONL files hold one template object per line. JSON files hold either a
+    list of template objects or a mapping of domain to a list of templates.
+    """
+    templates = []
+
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                line = line.strip()
+                if line:
+                    templates.append(_template_from_record(json.loads(line)))
+            return templates
+        data = json.load(f)
+
+    if isinstance(data, dict):
+        for domain, records in data.items():
+            templates.extend(_template_from_record(record, domain) for record in records)
+    else:
+        templates.extend(_template_from_record(record) for record in data)
+
+    return templates
+
+
+def builtin_templates() -> List[QuestionTemplate]:
+    """Templates shipped with the API"""
+    return [
+        make_template(domain, stem, choices, answer, base_difficulty)
+        for domain, rows in BUILTIN_TEMPLATES.items()
+        for stem, choices, answer, base_difficulty in rows
+    ]
+
+
+def load_question_bank(path: Optional[str] = None) -> QuestionBank:
+    """Build a question bank from a file, or from the built-in templates"""
+    if path:
+        return QuestionBank(load_templates(path))
+    return QuestionBank(builtin_templates())
+
+
+_bank: Optional[QuestionBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> QuestionBank:
+    """Shared bank, built on first use so importing this module stays cheap"""
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = load_question_bank(QUESTION_BANK_PATH)
+    return _bank
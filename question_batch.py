@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Columnar Question Batches for Wit Content API
+Generated questions are held as columns and only expanded to dicts at output
+"""
+
+import random
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from question_generator import bulk_chunks, iter_question_parts, new_seed
+
+
+class QuestionBatch:
+    """Questions for one domain and source sharing a single timestamp
+
+    Stems, choices and answers from bank templates are references to the
+    bank's interned strings and tuples, explanations for them are built at
+    expansion time, and difficulties live in a packed unsigned short array.
+    """
+
+    __slots__ = ('domain', 'source', 'created_at', 'stems', 'choices', 'answers', 'explanations', 'difficulties')
+
+    def __init__(self, domain: str, source: str, created_at: Optional[str] = None):
+        self.domain = domain
+        self.source = source
+        self.created_at = created_at or datetime.now().isoformat()
+        self.stems: List[str] = []
+        self.choices: List[Sequence[str]] = []
+        self.answers: List[str] = []
+        self.explanations: List[Optional[str]] = []
+        self.difficulties = array('H')
+
+    def __len__(self) -> int:
+        return len(self.difficulties)
+
+    def append(self, stem: str, choices: Sequence[str], answer: str, explanation: Optional[str], difficulty: int) -> None:
+        self.stems.append(stem)
+        self.choices.append(choices)
+        self.answers.append(answer)
+        self.explanations.append(explanation)
+        self.difficulties.append(difficulty)
+
+    def iter_dicts(self) -> Iterator[Dict]:
+        """Expand rows into the API's question dicts"""
+        domain, source, created_at = self.domain, self.source, self.created_at
+        for stem, choices, answer, explanation, difficulty in zip(
+                self.stems, self.choices, self.answers, self.explanations, self.difficulties):
+            yield {
+                "stem": stem,
+                "choices": list(choices),
+                "answer": answer,
+                "domain": domain,
+                "difficulty": difficulty,
+                "explanation": explanation or f"Explanation for {stem}",
+                "source": source,
+                "created_at": created_at
+            }
+
+    def to_dicts(self) -> List[Dict]:
+        return list(self.iter_dicts())
+
+
+def generate_question_batch(domain: str, count: int, difficulty_range: str, source: str,
+                            rng: Optional[random.Random] = None, start: int = 0,
+                            created_at: Optional[str] = None) -> QuestionBatch:
+    """Columnar equivalent of iter_questions_for_domain"""
+    if rng is None:
+        rng = random.Random(new_seed())
+    batch = QuestionBatch(domain, source, created_at)
+    append = batch.append
+    for parts in iter_question_parts(domain, count, difficulty_range, rng, start):
+        append(*parts)
+    return batch
+
+
+def generate_chunk_batch(chunk: tuple, source: str = 'bulk_generation', created_at: Optional[str] = None) -> QuestionBatch:
+    """Generate one bulk work unit as a batch"""
+    domain, difficulty, start, count, chunk_seed = chunk
+    return generate_question_batch(domain, count, difficulty, source, random.Random(chunk_seed), start, created_at)
+
+
+def generate_bulk_batches(domains: List[str], questions_per_domain: int, difficulty_distribution: Dict[str, float],
+                          source: str = 'bulk_generation', seed: Optional[int] = None) -> List[QuestionBatch]:
+    """Serial bulk generation into batches, matching iter_bulk_questions row for row"""
+    if seed is None:
+        seed = new_seed()
+    created_at = datetime.now().isoformat()
+    return [
+        generate_chunk_batch(chunk, source, created_at)
+        for chunk in bulk_chunks(domains, questions_per_domain, difficulty_distribution, seed)
+    ]
+
+
+def iter_batch_dicts(batches: Iterable[QuestionBatch]) -> Iterator[Dict]:
+    """Expand a sequence of batches in order"""
+    for batch in batches:
+        yield from batch.iter_dicts()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Question Generation for Wit Content API
+Shared by every server entry point; templates come from the question bank
+"""
+
+import hashlib
+import random
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from question_bank import get_question_bank, DIFFICULTY_BANDS, difficulty_band
+from template_engine import render, templates_for_domain
+
+# Bulk slices are split into chunks of this size, each with its own derived
+# seed, so serial and parallel runs draw identical difficulties
+BULK_CHUNK_SIZE = 5000
+
+
+def new_seed() -> int:
+    """Fresh seed for a run that did not ask for one"""
+    return secrets.randbits(32)
+
+
+def derive_seed(seed: int, *parts: int) -> int:
+    """Stable child seed, identical in every process"""
+    key = ':'.join(str(part) for part in (seed,) + parts).encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'big')
+
+
+def generate_questions_for_domain(domain: str, count: int, difficulty_range: str, source: str,
+                                  seed: Optional[int] = None) -> List[Dict]:
+    """Generate questions for a specific domain"""
+    rng = random.Random(new_seed() if seed is None else seed)
+    return list(iter_questions_for_domain(domain, count, difficulty_range, source, rng))
+
+
+def iter_question_parts(domain: str, count: int, difficulty_range: str,
+                        rng: random.Random, start: int = 0) -> Iterator[Tuple[str, Sequence[str], str, Optional[str], int]]:
+    """Yield (stem, choices, answer, explanation, difficulty) for a domain
+
+    Bank templates yield their shared choices tuple and no explanation, so
+    callers can defer building "Explanation for ..." until output.
+    """
+    min_diff, max_diff = DIFFICULTY_BANDS[difficulty_band(difficulty_range)]
+
+    domain_questions = get_question_bank().for_domain(domain)
+    if count > 0 and not domain_questions:
+        raise ValueError(f"Unknown domain: {domain}")
+
+    variations = templates_for_domain(domain)
+
+    # The bank's templates come first, then parameterised variations whose
+    # answers and distractors are computed from the drawn slot values
+    for i in range(start, start + count):
+        if i < len(domain_questions) or not variations:
+            template = domain_questions[i % len(domain_questions)]
+            stem, choices, answer, explanation = template.stem, template.choices, template.answer, None
+        else:
+            stem, choices, answer, explanation = render(variations[i % len(variations)], rng)
+
+        # Adjust difficulty to match requested range
+        yield stem, choices, answer, explanation, rng.randint(min_diff, max_diff)
+
+
+def iter_questions_for_domain(domain: str, count: int, difficulty_range: str, source: str,
+                              rng: Optional[random.Random] = None, start: int = 0) -> Iterator[Dict]:
+    """Yield questions for a specific domain one at a time
+
+    start offsets the variation index so a slice can be generated in chunks.
+    Slot values and difficulties come from rng, never the global random
+    state, so concurrent requests cannot disturb each other's sequences.
+    """
+    if rng is None:
+        rng = random.Random(new_seed())
+    created_at = datetime.now().isoformat()
+
+    for stem, choices, answer, explanation, difficulty in iter_question_parts(domain, count, difficulty_range, rng, start):
+        yield {
+            "stem": stem,
+            "choices": list(choices),
+            "answer": answer,
+            "domain": domain,
+            "difficulty": difficulty,
+            "explanation": explanation or f"Explanation for {stem}",
+            "source": source,
+            "created_at": created_at
+        }
+
+
+def bulk_slices(domains: List[str], questions_per_domain: int, difficulty_distribution: Dict[str, float]) -> List[tuple]:
+    """(domain, difficulty, count) slices of a bulk request in output order"""
+    slices = []
+    for domain in domains:
+        for difficulty, percentage in difficulty_distribution.items():
+            count = int(questions_per_domain * percentage)
+            if count > 0:
+                if not get_question_bank().for_domain(domain):
+                    raise ValueError(f"Unknown domain: {domain}")
+                slices.append((domain, difficulty, count))
+    return slices
+
+
+def bulk_chunks(domains: List[str], questions_per_domain: int, difficulty_distribution: Dict[str, float],
+                seed: int, chunk_size: int = BULK_CHUNK_SIZE) -> List[tuple]:
+    """(domain, difficulty, start, count, seed) work units of a bulk request in output order"""
+    chunks = []
+    for index, (domain, difficulty, count) in enumerate(bulk_slices(domains, questions_per_domain, difficulty_distribution)):
+        for start in range(0, count, chunk_size):
+            chunks.append((domain, difficulty, start, min(chunk_size, count - start), derive_seed(seed, index, start)))
+    return chunks
+
+
+def iter_bulk_questions(domains: List[str], questions_per_domain: int, difficulty_distribution: Dict[str, float],
+                        source: str = 'bulk_generation', seed: Optional[int] = None) -> Iterator[Dict]:
+    """Yield every question of a bulk request without materialising the batch"""
+    if seed is None:
+        seed = new_seed()
+    for domain, difficulty, start, count, chunk_seed in bulk_chunks(domains, questions_per_domain, difficulty_distribution, seed):
+        yield from iter_questions_for_domain(domain, count, difficulty, source, random.Random(chunk_seed), start)
+
+
+def iter_slice_questions(domain: str, difficulty: str, slice_index: int, seed: int, start: int, count: int,
+                         source: str = 'bulk_generation', chunk_size: int = BULK_CHUNK_SIZE) -> Iterator[Dict]:
+    """Questions start..start+count of one bulk slice, identical to that span of iter_bulk_questions
+
+    Generation resumes from the rng state where an earlier call stopped
+    when this process still has it, and otherwise replays the chunk holding
+    start up to the offset, so the cost is count plus at most one chunk.
+    """
+    while count > 0:
+        chunk_start = start - start % chunk_size
+        skip = start - chunk_start
+        take = min(count, chunk_size - skip)
+        rng = random.Random(derive_seed(seed, slice_index, chunk_start))
+        state = _pop_resume_state((seed, slice_index, domain, difficulty, start)) if skip else None
+        if state is not None:
+            rng.setstate(state)
+            yield from iter_questions_for_domain(domain, take, difficulty, source, rng, start)
+        else:
+            yield from islice(iter_questions_for_domain(domain, skip + take, difficulty, source, rng, chunk_start), skip, None)
+        start += take
+        count -= take
+        if start % chunk_size:
+            _save_resume_state((seed, slice_index, domain, difficulty, start), rng.getstate())
+
+
+# Where recent slice pages stopped; each rng state is a few KB, so keep a bounded number
+RESUME_CACHE_SIZE = 256
+_resume_states: 'OrderedDict[tuple, tuple]' = OrderedDict()
+_resume_lock = threading.Lock()
+
+
+def _pop_resume_state(key: tuple) -> Optional[tuple]:
+    with _resume_lock:
+        return _resume_states.pop(key, None)
+
+
+def _save_resume_state(key: tuple, state: tuple) -> None:
+    with _resume_lock:
+        _resume_states[key] = state
+        while len(_resume_states) > RESUME_CACHE_SIZE:
+            _resume_states.popitem(last=False)
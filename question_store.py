@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+SQLite Question Store for Wit Content API
+Optional local persistence so generated questions can be served many times
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dedup import stem_key
+from serialization import dumps
+
+# Unset leaves persistence off; set to a file path to enable it
+STORE_PATH = os.environ.get('WIT_STORE_PATH')
+
+STORE_ENABLED = bool(STORE_PATH)
+
+# Rows written per executemany/transaction
+STORE_BATCH_SIZE = int(os.environ.get('WIT_STORE_BATCH_SIZE', 1000))
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS questions (
+        id INTEGER PRIMARY KEY,
+        stem TEXT NOT NULL,
+        choices TEXT NOT NULL,
+        answer TEXT NOT NULL,
+        domain TEXT NOT NULL,
+        difficulty INTEGER NOT NULL,
+        explanation TEXT,
+        source TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        stem_hash BLOB NOT NULL
+    )""",
+    # Secondary indexes end in the rowid, so each one also serves keyset paging by id
+    "CREATE INDEX IF NOT EXISTS questions_domain ON questions (domain)",
+    "CREATE INDEX IF NOT EXISTS questions_difficulty ON questions (difficulty)",
+    "CREATE INDEX IF NOT EXISTS questions_source ON questions (source)",
+    "CREATE INDEX IF NOT EXISTS questions_stem_hash ON questions (stem_hash)",
+)
+
+INSERT = """INSERT INTO questions (stem, choices, answer, domain, difficulty, explanation, source, created_at, stem_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+COLUMNS = "id, stem, choices, answer, domain, difficulty, explanation, source, created_at"
+
+
+class QuestionStore:
+    """SQLite database of generated questions
+
+    Each thread gets its own connection. WAL lets readers carry on while a
+    batch is written, and writes within a process are serialised so they
+    never wait on SQLite's busy handler against each other.
+    """
+
+    def __init__(self, path: str, batch_size: int = STORE_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._write_lock:
+            connection = self._connection()
+            for statement in SCHEMA:
+                connection.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Autocommit mode; transactions are opened explicitly around each batch
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _row(question: Dict[str, Any]) -> Tuple:
+        return (
+            question['stem'],
+            dumps(list(question['choices'])).decode('utf-8'),
+            question['answer'],
+            question['domain'],
+            int(question['difficulty']),
+            question.get('explanation'),
+            question.get('source', ''),
+            question.get('created_at', ''),
+            stem_key(question['stem'])
+        )
+
+    def _write_batch(self, rows: List[Tuple]) -> None:
+        connection = self._connection()
+        with self._write_lock:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(INSERT, rows)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def add_many(self, questions: Iterable[Dict[str, Any]]) -> int:
+        """Insert questions in batched transactions, returning how many were written"""
+        written = 0
+        rows: List[Tuple] = []
+        for question in questions:
+            rows.append(self._row(question))
+            if len(rows) >= self.batch_size:
+                self._write_batch(rows)
+                written += len(rows)
+                rows = []
+        if rows:
+            self._write_batch(rows)
+            written += len(rows)
+        return written
+
+    def tee(self, questions: Iterable[Dict[str, Any]], report: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+        """Pass questions through while storing them a batch at a time
+
+        report, when given, holds the running "stored" count. A batch is
+        written before its questions are yielded, so anything a client has
+        received is already stored.
+        """
+        if report is None:
+            report = {}
+        report['stored'] = 0
+        batch: List[Dict[str, Any]] = []
+        for question in questions:
+            batch.append(question)
+            if len(batch) >= self.batch_size:
+                report['stored'] += self.add_many(batch)
+                yield from batch
+                batch = []
+        if batch:
+            report['stored'] += self.add_many(batch)
+            yield from batch
+
+    @staticmethod
+    def _question(row: Tuple) -> Dict[str, Any]:
+        question_id, stem, choices, answer, domain, difficulty, explanation, source, created_at = row
+        return {
+            "id": question_id,
+            "stem": stem,
+            "choices": json.loads(choices),
+            "answer": answer,
+            "domain": domain,
+            "difficulty": difficulty,
+            "explanation": explanation or f"Explanation for {stem}",
+            "source": source,
+            "created_at": created_at
+        }
+
+    def get(self, question_id: int) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(f"SELECT {COLUMNS} FROM questions WHERE id = ?", (question_id,)).fetchone()
+        return self._question(row) if row else None
+
+    def get_many(self, question_ids: List[int]) -> List[Dict[str, Any]]:
+        """Stored questions in the order of question_ids, skipping any that are missing"""
+        if not question_ids:
+            return []
+        placeholders = ', '.join('?' * len(question_ids))
+        rows = self._connection().execute(
+            f"SELECT {COLUMNS} FROM questions WHERE id IN ({placeholders})", question_ids
+        ).fetchall()
+        by_id = {row[0]: row for row in rows}
+        return [self._question(by_id[question_id]) for question_id in question_ids if question_id in by_id]
+
+    def index_rows(self, after: int = 0) -> Iterator[Tuple[int, str, int]]:
+        """(id, domain, difficulty) for every question with id > after, in id order"""
+        cursor = self._connection().execute(
+            "SELECT id, domain, difficulty FROM questions WHERE id > ? ORDER BY id", (after,)
+        )
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                return
+            yield from rows
+
+    def page(self, after: int = 0, limit: int = DEFAULT_PAGE_SIZE, domain: Optional[str] = None,
+             source: Optional[str] = None, min_difficulty: Optional[int] = None,
+             max_difficulty: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Questions with id > after in id order, plus the cursor for the next page
+
+        Keyset paging costs the same on the last page as on the first,
+        unlike OFFSET, which rescans every skipped row.
+        """
+        clauses = ["id > ?"]
+        params: List[Any] = [after]
+        for clause, value in (("domain = ?", domain), ("source = ?", source),
+                              ("difficulty >= ?", min_difficulty), ("difficulty <= ?", max_difficulty)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        params.append(limit + 1)
+
+        rows = self._connection().execute(
+            f"SELECT {COLUMNS} FROM questions WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ?", params
+        ).fetchall()
+        has_more = len(rows) > limit
+        questions = [self._question(row) for row in rows[:limit]]
+        return questions, questions[-1]['id'] if has_more else None
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+
+_store: Optional[QuestionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Optional[QuestionStore]:
+    """Shared store, opened on first use; None when WIT_STORE_PATH is unset"""
+    global _store
+    if not STORE_ENABLED:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = QuestionStore(STORE_PATH)
+    return _store
+
+
+def require_store() -> QuestionStore:
+    """Shared store, or ValueError when persistence is off"""
+    store = get_store()
+    if store is None:
+        raise ValueError("Question store is disabled; set WIT_STORE_PATH to enable it")
+    return store
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Request Parameter Parsing for Wit Content API
+Normalises bulk request bodies, including the string-encoded values n8n sends
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict
+
+from daily_challenges import parse_challenge_date
+from question_bank import get_question_bank
+from question_generator import new_seed
+from question_store import STORE_ENABLED
+
+DEFAULT_DOMAINS = ['quant', 'verbal', 'spatial', 'logic', 'data']
+
+DEFAULT_DIFFICULTY_DISTRIBUTION = {
+    'basic': 0.3,
+    'intermediate': 0.4,
+    'advanced': 0.2,
+    'expert': 0.1
+}
+
+DEFAULT_CHALLENGE_DAYS = 730  # 2 years
+
+# Paged bulk requests: the default matches n8n's Split In Batches size
+DEFAULT_BULK_PAGE_SIZE = 100
+BULK_MAX_PAGE_SIZE = int(os.environ.get('WIT_BULK_MAX_PAGE_SIZE', 10000))
+
+# Fan bulk generation out to worker processes unless the request says otherwise
+DEFAULT_PARALLEL = os.environ.get('WIT_PARALLEL_BULK', '').lower() in ('1', 'true', 'yes')
+
+
+def parse_bool(value: Any, default: bool = False) -> bool:
+    """Interpret JSON booleans and the string forms n8n sends"""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def json_object(request) -> Dict[str, Any]:
+    """Request body as a JSON object, or ValueError for a missing or malformed one"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    return data
+
+
+def parse_count(value: Any, name: str) -> int:
+    """Non-negative integer, accepting the string form n8n sends"""
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be a non-negative integer")
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a non-negative integer")
+    if value < 0:
+        raise ValueError(f"{name} must be a non-negative integer")
+    return value
+
+
+def parse_domain(value: Any) -> str:
+    """Domain name that the question bank knows"""
+    if not isinstance(value, str) or not get_question_bank().for_domain(value):
+        raise ValueError(f"Unknown domain: {value}")
+    return value
+
+
+def parse_date(value: Any, name: str) -> str:
+    """YYYY-MM-DD date string"""
+    try:
+        parse_challenge_date(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a YYYY-MM-DD date")
+    return value
+
+
+def parse_seed(value: Any) -> int:
+    """Request seed as an int, or a fresh one when the request has none"""
+    if value is None or value == '':
+        return new_seed()
+    if isinstance(value, bool):
+        raise ValueError("seed must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError("seed must be an integer")
+
+
+def parse_page_params(data: Dict[str, Any]) -> Dict[str, Any]:
+    """page_size and cursor of a bulk body; page_size stays None for an unpaged request"""
+    page_size = data.get('page_size')
+    cursor = data.get('cursor') or None
+    if page_size is None or page_size == '':
+        page_size = DEFAULT_BULK_PAGE_SIZE if cursor else None
+    else:
+        try:
+            page_size = int(page_size)
+        except (TypeError, ValueError):
+            raise ValueError("page_size must be an integer")
+        if not 1 <= page_size <= BULK_MAX_PAGE_SIZE:
+            raise ValueError(f"page_size must be between 1 and {BULK_MAX_PAGE_SIZE}")
+    if cursor is not None and not isinstance(cursor, str):
+        raise ValueError("Invalid cursor")
+    return {"page_size": page_size, "cursor": cursor}
+
+
+def parse_bulk_questions_params(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalise a /generate-bulk-questions body"""
+    domains = data.get('domains', DEFAULT_DOMAINS)
+    questions_per_domain = data.get('questions_per_domain', 100)
+    difficulty_distribution = data.get('difficulty_distribution', DEFAULT_DIFFICULTY_DISTRIBUTION)
+
+    # Handle case where domains and difficulty_distribution come as JSON strings from n8n
+    if isinstance(domains, str):
+        try:
+            domains = json.loads(domains)
+        except ValueError:
+            domains = list(DEFAULT_DOMAINS)
+
+    if isinstance(difficulty_distribution, str):
+        try:
+            difficulty_distribution = json.loads(difficulty_distribution)
+        except ValueError:
+            difficulty_distribution = dict(DEFAULT_DIFFICULTY_DISTRIBUTION)
+
+    if not isinstance(domains, list):
+        raise ValueError("domains must be a list of domain names")
+    if not isinstance(difficulty_distribution, dict):
+        raise ValueError("difficulty_distribution must map difficulty bands to fractions")
+    try:
+        difficulty_distribution = {band: float(share) for band, share in difficulty_distribution.items()}
+    except (TypeError, ValueError):
+        raise ValueError("difficulty_distribution must map difficulty bands to fractions")
+
+    return {
+        "domains": [parse_domain(domain) for domain in domains],
+        "questions_per_domain": parse_count(questions_per_domain, 'questions_per_domain'),
+        "difficulty_distribution": difficulty_distribution,
+        "parallel": parse_bool(data.get('parallel'), DEFAULT_PARALLEL),
+        "seed": parse_seed(data.get('seed')),
+        "unique": parse_bool(data.get('unique')),
+        "store": parse_bool(data.get('store'), STORE_ENABLED),
+        **parse_page_params(data)
+    }
+
+
+def parse_bulk_challenges_params(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalise a /generate-daily-challenges-bulk body"""
+    start_date = parse_date(data.get('start_date', datetime.now().strftime('%Y-%m-%d')), 'start_date')
+    days = data.get('days', DEFAULT_CHALLENGE_DAYS)
+
+    # Handle case where days comes as a string from n8n
+    if isinstance(days, str):
+        try:
+            days = int(days)
+        except ValueError:
+            days = DEFAULT_CHALLENGE_DAYS
+    if isinstance(days, bool) or not isinstance(days, int):
+        raise ValueError("days must be an integer")
+
+    # An explicit end_date turns the request into an inclusive range query
+    end_date = data.get('end_date')
+    if end_date:
+        start = parse_challenge_date(start_date)
+        end = parse_challenge_date(parse_date(end_date, 'end_date'))
+        if end < start:
+            raise ValueError("end_date must not be before start_date")
+        days = (end - start).days + 1
+
+    return {
+        "start_date": start_date,
+        "days": days,
+        **parse_page_params(data)
+    }
+
+
+def parse_question_params(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalise a /generate-questions body, or one spec of a batch"""
+    return {
+        "domain": parse_domain(data.get('domain', 'quant')),
+        "count": parse_count(data.get('count', 10), 'count'),
+        "difficulty_range": data.get('difficulty_range', 'intermediate'),
+        "source": data.get('source', 'n8n_workflow'),
+        "seed": parse_seed(data.get('seed'))
+    }
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Runtime Data Directory for Wit Content API
+Where worker processes keep the files and databases they share
+"""
+
+import os
+import tempfile
+
+# Runtime files go under a data directory rather than the working directory
+DATA_DIR = os.environ.get('WIT_DATA_DIR', os.path.join(tempfile.gettempdir(), 'wit-content-api'))
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this pid still exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to someone else
+        return True
+    return True
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+JSON Serialisation for Wit Content API
+Uses orjson when it is installed and falls back to the stdlib encoder
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# auto picks orjson when available; json forces the stdlib encoder
+JSON_BACKEND = os.environ.get('WIT_JSON_BACKEND', 'auto').lower()
+
+USE_ORJSON = orjson is not None and JSON_BACKEND in ('auto', 'orjson')
+
+_stdlib_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=str).encode
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode obj as compact UTF-8 JSON"""
+    if USE_ORJSON:
+        return orjson.dumps(obj, default=str)
+    return _stdlib_encode(obj).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by dumps()"""
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode('utf-8')
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+def init_json(app: Flask) -> None:
+    """Route jsonify through the fast encoder"""
+    app.json = FastJSONProvider(app)
+
+
+@lru_cache(maxsize=None)
+def _challenge_fragments(challenge_type: str, static_items: Tuple[Tuple[str, Any], ...]) -> Tuple[bytes, bytes]:
+    """Pre-encoded text around the date and created_at of a challenge"""
+    static = dumps(dict(static_items))
+    metadata = dumps({"is_daily_challenge": True, "challenge_type": challenge_type})
+    prefix = static[:-1] + b',"metadata":' + metadata[:-1] + b',"challenge_date":"'
+    return prefix, b'"},"created_at":"'
+
+
+_SPLICED_CHALLENGE_KEYS = frozenset(('stem', 'choices', 'answer', 'domain', 'difficulty', 'explanation',
+                                     'source', 'metadata', 'created_at'))
+
+
+def _static_challenge_items(challenge: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    return tuple(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in challenge.items()
+        if key not in ('metadata', 'created_at')
+    )
+
+
+def encode_challenges(challenges: Iterable[Dict[str, Any]]) -> bytes:
+    """JSON array of daily challenges
+
+    With the stdlib encoder, each challenge type's fixed body is encoded once
+    and only the date and created_at are spliced in per item.
+    """
+    if USE_ORJSON:
+        return dumps(list(challenges))
+
+    parts: List[bytes] = []
+    for challenge in challenges:
+        metadata = challenge.get('metadata') or {}
+        if challenge.keys() != _SPLICED_CHALLENGE_KEYS or metadata.keys() != {'is_daily_challenge', 'challenge_date', 'challenge_type'}:
+            parts.append(dumps(challenge))
+            continue
+        prefix, middle = _challenge_fragments(metadata['challenge_type'], _static_challenge_items(challenge))
+        parts.append(b''.join((
+            prefix, metadata['challenge_date'].encode('ascii'), middle, challenge['created_at'].encode('ascii'), b'"}'
+        )))
+    return b'[' + b','.join(parts) + b']'
+
+
+def encode_items(items: Iterable[Any]) -> bytes:
+    """JSON array built one item at a time, so items can be expanded lazily"""
+    return b'[' + b','.join(dumps(item) for item in items) + b']'
+
+
+def envelope_response(fields: Dict[str, Any], items_key: str, items_json: bytes, status: int = 200) -> Response:
+    """JSON object response with a pre-encoded array spliced in under items_key"""
+    head = dumps(fields)
+    separator = b',' if fields else b''
+    body = head[:-1] + separator + dumps(items_key) + b':' + items_json + b'}'
+    return Response(body, status=status, mimetype='application/json')
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Startup Timing for Wit Content API
+Records import, warm-up and time-to-first-healthy-response for each process
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Imported first by app_factory, so this is as close to process start as the app can see
+STARTED = time.perf_counter()
+
+
+class StartupReport:
+    """Seconds from STARTED to each startup milestone"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.imports_seconds: Optional[float] = None
+        self.app_ready_seconds: Optional[float] = None
+        self.first_healthy_seconds: Optional[float] = None
+        self.warm_up: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def elapsed() -> float:
+        return round(time.perf_counter() - STARTED, 4)
+
+    def mark_imports(self) -> None:
+        self.imports_seconds = self.elapsed()
+
+    def mark_app_ready(self) -> None:
+        self.app_ready_seconds = self.elapsed()
+
+    def time_step(self, name: str, step: Callable[[], Any]) -> Any:
+        """Run one warm-up step and record how long it took"""
+        began = time.perf_counter()
+        result = step()
+        self.warm_up[name] = round(time.perf_counter() - began, 4)
+        return result
+
+    def mark_healthy(self) -> bool:
+        """Record the first healthy response; True only the first time in this process"""
+        if self.first_healthy_seconds is not None and self.pid == os.getpid():
+            return False
+        with self._lock:
+            # Workers forked from a preloaded master inherit its report
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.first_healthy_seconds = None
+            if self.first_healthy_seconds is not None:
+                return False
+            self.first_healthy_seconds = self.elapsed()
+            return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pid": self.pid,
+            "imports_seconds": self.imports_seconds,
+            "warm_up_seconds": dict(self.warm_up),
+            "app_ready_seconds": self.app_ready_seconds,
+            "first_healthy_seconds": self.first_healthy_seconds
+        }
+
+    def summary(self) -> str:
+        steps = ', '.join(f"{name} {seconds:.3f}s" for name, seconds in self.warm_up.items()) or 'deferred'
+        text = f"imports {self.imports_seconds or 0:.3f}s, warm-up [{steps}], app ready {self.app_ready_seconds or 0:.3f}s"
+        if self.first_healthy_seconds is not None:
+            text += f", first healthy {self.first_healthy_seconds:.3f}s"
+        return text
+
+
+STARTUP = StartupReport()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Stored Question Endpoints for Wit Content API
+Keyset-paged reads from the optional SQLite question store
+"""
+
+from flask import Blueprint, request, jsonify
+
+from question_store import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, get_store
+
+store_bp = Blueprint('store', __name__)
+
+
+def _disabled():
+    return jsonify({"error": "Question store is disabled; set WIT_STORE_PATH to enable it"}), 503
+
+
+def _optional_int(name: str):
+    value = request.args.get(name)
+    return int(value) if value not in (None, '') else None
+
+
+@store_bp.route('/questions', methods=['GET'])
+def list_questions():
+    """Page through stored questions, oldest first
+
+    Pass the returned next_cursor as ?cursor= to fetch the following page;
+    it is null on the last page.
+    """
+    store = get_store()
+    if store is None:
+        return _disabled()
+
+    try:
+        after = _optional_int('cursor') or 0
+        limit = min(MAX_PAGE_SIZE, max(1, _optional_int('limit') or DEFAULT_PAGE_SIZE))
+        min_difficulty = _optional_int('min_difficulty')
+        max_difficulty = _optional_int('max_difficulty')
+    except ValueError:
+        return jsonify({"error": "cursor, limit, min_difficulty and max_difficulty must be integers"}), 400
+
+    try:
+        questions, next_cursor = store.page(after, limit, request.args.get('domain'), request.args.get('source'),
+                                            min_difficulty, max_difficulty)
+        return jsonify({
+            "success": True,
+            "questions": questions,
+            "count": len(questions),
+            "next_cursor": next_cursor
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@store_bp.route('/questions/<int:question_id>', methods=['GET'])
+def get_question(question_id: int):
+    """A single stored question"""
+    store = get_store()
+    if store is None:
+        return _disabled()
+
+    question = store.get(question_id)
+    if question is None:
+        return jsonify({"error": "Question not found"}), 404
+    return jsonify({"success": True, "question": question})
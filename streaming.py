@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Streaming Responses for Wit Content API
+NDJSON output that writes one item per line as it is generated
+"""
+
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from flask import Response, stream_with_context
+
+from serialization import dumps
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_ndjson(request) -> bool:
+    """True when the client opted into a streamed NDJSON response"""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    # Only an explicit NDJSON entry counts; */* keeps the JSON default
+    return any(mimetype == NDJSON_MIMETYPE and quality > 0 for mimetype, quality in request.accept_mimetypes)
+
+
+def iter_ndjson(items: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode items as newline-delimited JSON, one line per item"""
+    for item in items:
+        yield dumps(item) + b'\n'
+
+
+def ndjson_response(items: Iterable[Dict[str, Any]], total_count: Optional[int] = None) -> Response:
+    """Stream items to the client without building the full payload"""
+    response = Response(stream_with_context(iter_ndjson(items)), mimetype=NDJSON_MIMETYPE)
+    if total_count is not None:
+        response.headers['X-Total-Count'] = str(total_count)
+    return response
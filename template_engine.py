@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Parameterised Question Templates for Wit Content API
+Templates declare typed slots and compute the answer and distractors from them
+"""
+
+import random
+from math import gcd
+from string import Formatter
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+Values = Dict[str, Any]
+
+# Slot kinds
+NUMBER = 'number'
+WORD = 'word'
+DIRECTION = 'direction'
+SEQUENCE = 'sequence'
+
+DIRECTIONS = ("North", "East", "South", "West")
+
+
+class Slot(NamedTuple):
+    """Typed template slot; values holds every value the slot can take"""
+    name: str
+    kind: str
+    values: Sequence[Any]
+
+    def draw(self, rng: random.Random) -> Any:
+        # random() is several times cheaper than randrange() on the hot path
+        return self.values[int(rng.random() * len(self.values))]
+
+
+def number(name: str, low: int, high: int, step: int = 1) -> Slot:
+    """Integer slot in [low, high]"""
+    return Slot(name, NUMBER, range(low, high + 1, step))
+
+
+def word(name: str, words: Iterable[str]) -> Slot:
+    """Slot drawn from a fixed word list"""
+    return Slot(name, WORD, tuple(words))
+
+
+def direction(name: str, directions: Iterable[str] = DIRECTIONS) -> Slot:
+    """Compass direction slot"""
+    return Slot(name, DIRECTION, tuple(directions))
+
+
+def sequence(name: str, sequences: Iterable[Tuple[int, ...]]) -> Slot:
+    """Slot whose values are whole number sequences; the last term is the answer"""
+    return Slot(name, SEQUENCE, tuple(tuple(s) for s in sequences))
+
+
+class CompiledPattern:
+    """Format string pre-split into literal fragments and field names
+
+    The fragments are re-joined once into a positional %-template so each
+    render is a single C-level substitution with no re-parsing.
+    """
+
+    __slots__ = ('fragments', 'fields', '_template')
+
+    def __init__(self, pattern: str):
+        fragments = []
+        fields = []
+        for literal, field, _, _ in Formatter().parse(pattern):
+            fragments.append(literal)
+            if field is not None:
+                fields.append(field)
+        if len(fragments) == len(fields):
+            fragments.append('')
+        self.fragments = tuple(fragments)
+        self.fields = tuple(fields)
+        self._template = '%s'.join(fragment.replace('%', '%%') for fragment in fragments)
+
+    def render(self, values: Values) -> str:
+        return self._template % tuple([values[field] for field in self.fields])
+
+
+class QuestionTemplateSpec(NamedTuple):
+    """Compiled parameterised template"""
+    domain: str
+    base_difficulty: int
+    stem: CompiledPattern
+    explanation: CompiledPattern
+    slots: Tuple[Slot, ...]
+    derive: Optional[Callable[[Values], Values]]
+    solve: Callable[[Values, random.Random], Tuple[str, List[str]]]
+    fixed_choices: Optional[Tuple[str, ...]]
+
+
+def compile_template(domain: str, base_difficulty: int, stem: str, explanation: str, slots: Iterable[Slot],
+                     solve: Callable[[Values, random.Random], Tuple[str, List[str]]],
+                     derive: Optional[Callable[[Values], Values]] = None,
+                     fixed_choices: Optional[Iterable[str]] = None) -> QuestionTemplateSpec:
+    """Pre-parse a template once so rendering is a join over fragments
+
+    solve returns (answer, distractors), or (answer, None) when the template
+    uses fixed_choices. derive adds computed display values to the drawn slots.
+    """
+    return QuestionTemplateSpec(
+        domain, base_difficulty, CompiledPattern(stem), CompiledPattern(explanation), tuple(slots),
+        derive, solve, tuple(fixed_choices) if fixed_choices else None
+    )
+
+
+def render(template: QuestionTemplateSpec, rng: random.Random) -> Tuple[str, List[str], str, str]:
+    """Draw slot values and return (stem, choices, answer, explanation)"""
+    values = {slot.name: slot.draw(rng) for slot in template.slots}
+    if template.derive is not None:
+        values.update(template.derive(values))
+    answer, distractors = template.solve(values, rng)
+    values['answer'] = answer
+
+    if template.fixed_choices is not None:
+        choices = list(template.fixed_choices)
+    else:
+        choices = list(distractors)
+        choices.insert(int(rng.random() * (len(choices) + 1)), answer)
+
+    return template.stem.render(values), choices, answer, template.explanation.render(values)
+
+
+def fmt(value: float) -> str:
+    """Render a number without a trailing .0"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def distinct(answer: str, candidates: Iterable[str], fallback: Callable[[int], str], size: int = 3) -> List[str]:
+    """First `size` candidates that differ from the answer and each other"""
+    picked: List[str] = []
+    for candidate in candidates:
+        if candidate != answer and candidate not in picked:
+            picked.append(candidate)
+            if len(picked) == size:
+                return picked
+    offset = 1
+    while len(picked) < size:
+        candidate = fallback(offset)
+        if candidate != answer and candidate not in picked:
+            picked.append(candidate)
+        offset += 1
+    return picked
+
+
+def numeric_distractors(answer: int, candidates: Iterable[int], suffix: str = '', prefix: str = '') -> Tuple[str, List[str]]:
+    """Answer plus three positive numeric distractors, formatted alike"""
+    render_value = lambda v: f"{prefix}{fmt(v)}{suffix}"
+    options = (render_value(c) for c in candidates if c > 0)
+    return render_value(answer), distinct(render_value(answer), options, lambda k: render_value(answer + k))
+
+
+# --- Quantitative -----------------------------------------------------------
+
+def _solve_percent(v: Values, rng: random.Random):
+    answer = v['pct'] * v['base'] // 100
+    step = max(1, v['base'] // 20)
+    return numeric_distractors(answer, (answer + step, answer - step, answer + 2 * step, answer * 2))
+
+
+def _solve_rectangle(v: Values, rng: random.Random):
+    area = v['length'] * v['width']
+    return numeric_distractors(area, (2 * (v['length'] + v['width']), v['length'] + v['width'], area + v['width']))
+
+
+def _derive_linear(v: Values) -> Values:
+    return {"c": v['a'] * v['x'] + v['b']}
+
+
+def _solve_linear(v: Values, rng: random.Random):
+    return numeric_distractors(v['x'], (v['x'] + 2, v['c'] // v['a'], v['x'] - 2, v['c'] - v['b']))
+
+
+def _derive_power(v: Values) -> Values:
+    return {"result": v['base'] ** v['exp']}
+
+
+def _solve_power(v: Values, rng: random.Random):
+    result = v['result']
+    return numeric_distractors(result, (v['base'] * v['exp'], v['base'] ** (v['exp'] - 1), v['base'] ** (v['exp'] + 1)))
+
+
+# --- Verbal -----------------------------------------------------------------
+
+ANTONYMS = {
+    "generous": "stingy", "brave": "cowardly", "fast": "slow", "honest": "deceitful",
+    "ancient": "modern", "wise": "foolish", "happy": "sad", "bright": "dim",
+    "strong": "weak", "early": "late", "rigid": "flexible", "humble": "arrogant",
+    "scarce": "plentiful", "calm": "anxious", "polite": "rude", "visible": "hidden"
+}
+
+SYNONYMS = {
+    "happy": "joyful", "big": "large", "smart": "intelligent", "quick": "rapid",
+    "angry": "furious", "tired": "weary", "brave": "courageous", "calm": "serene",
+    "rich": "wealthy", "small": "tiny", "begin": "commence", "difficult": "arduous",
+    "honest": "truthful", "loyal": "faithful", "odd": "peculiar", "sad": "gloomy"
+}
+
+YOUNG_ANIMALS = {
+    "Dog": "Puppy", "Cat": "Kitten", "Cow": "Calf", "Horse": "Foal", "Sheep": "Lamb",
+    "Goat": "Kid", "Bear": "Cub", "Duck": "Duckling", "Frog": "Tadpole",
+    "Kangaroo": "Joey", "Swan": "Cygnet", "Deer": "Fawn"
+}
+
+ANIMAL_PAIRS = tuple((a, b) for a in YOUNG_ANIMALS for b in YOUNG_ANIMALS if a != b)
+
+
+def _pick_words(answer: str, pool: Sequence[str], rng: random.Random) -> List[str]:
+    return distinct(answer, rng.sample(pool, 4), lambda k: pool[k % len(pool)])
+
+
+def _solve_antonym(v: Values, rng: random.Random):
+    answer = ANTONYMS[v['word']]
+    return answer, _pick_words(answer, _ANTONYM_CHOICES[v['word']], rng)
+
+
+def _solve_synonym(v: Values, rng: random.Random):
+    answer = SYNONYMS[v['word']]
+    return answer, _pick_words(answer, _SYNONYM_CHOICES[v['word']], rng)
+
+
+def _derive_animals(v: Values) -> Values:
+    first, second = v['animals']
+    return {"first": first, "first_young": YOUNG_ANIMALS[first], "second": second}
+
+
+def _solve_animals(v: Values, rng: random.Random):
+    answer = YOUNG_ANIMALS[v['second']]
+    return answer, _pick_words(answer, _YOUNG_POOL, rng)
+
+
+def _linked_words() -> Dict[str, set]:
+    """Every word paired with each word in either table, in both directions"""
+    linked: Dict[str, set] = {}
+    for table in (ANTONYMS, SYNONYMS):
+        for first, second in table.items():
+            linked.setdefault(first, set()).add(second)
+            linked.setdefault(second, set()).add(first)
+    return linked
+
+
+def _word_choices(table: Dict[str, str], pool: Sequence[str]) -> Dict[str, Tuple[str, ...]]:
+    """Distractor pool per stem word, without the stem or anything paired with the answer
+
+    Otherwise "opposite of happy" could offer both 'sad' and its synonym
+    'gloomy', or the synonym pool could offer the stem word itself.
+    """
+    linked = _linked_words()
+    return {
+        stem: tuple(w for w in pool if w != stem and w != answer and w not in linked.get(answer, ()))
+        for stem, answer in table.items()
+    }
+
+
+_VERBAL_POOL = tuple(dict.fromkeys(tuple(ANTONYMS.values()) + tuple(SYNONYMS.values())))
+_ANTONYM_CHOICES = _word_choices(ANTONYMS, _VERBAL_POOL)
+_SYNONYM_CHOICES = _word_choices(SYNONYMS, _VERBAL_POOL)
+_YOUNG_POOL = tuple(YOUNG_ANIMALS.values())
+
+
+# --- Spatial ----------------------------------------------------------------
+
+TURNS = {"once": 1, "twice": 2, "three times": 3}
+
+PERPENDICULAR = (("north", "east"), ("north", "west"), ("south", "east"), ("south", "west"),
+                 ("east", "north"), ("east", "south"), ("west", "north"), ("west", "south"))
+
+PYTHAGOREAN_TRIPLES = tuple(
+    (a * k, b * k, c * k)
+    for a, b, c in ((3, 4, 5), (5, 12, 13), (8, 15, 17), (7, 24, 25), (20, 21, 29), (9, 40, 41))
+    for k in range(1, 21)
+    if c * k <= 100
+)
+
+
+def _solve_turn(v: Values, rng: random.Random):
+    step = 1 if v['side'] == 'right' else -1
+    index = DIRECTIONS.index(v['facing'].capitalize()) + step * TURNS[v['times']]
+    return DIRECTIONS[index % 4], None
+
+
+def _derive_walk(v: Values) -> Values:
+    a, b, c = v['triple']
+    first, second = v['heading']
+    return {"a": a, "b": b, "c": c, "dir1": first, "dir2": second}
+
+
+def _solve_walk(v: Values, rng: random.Random):
+    return numeric_distractors(v['c'], (v['a'] + v['b'], v['c'] + 2, v['c'] - 1, v['c'] + 4), suffix=' blocks')
+
+
+# --- Logic ------------------------------------------------------------------
+
+GEOMETRIC_SEQUENCES = tuple(
+    tuple(start * ratio ** n for n in range(5))
+    for start in range(1, 10) for ratio in (2, 3)
+)
+
+ARITHMETIC_SEQUENCES = tuple(
+    tuple(start + diff * n for n in range(6))
+    for start in range(1, 100) for diff in range(3, 15)
+)
+
+SQUARE_SEQUENCES = tuple(tuple((start + n) ** 2 for n in range(5)) for start in range(1, 31))
+
+SYLLOGISMS = (
+    ("students", "student", "study", "studies", "does not study", "don't study"),
+    ("doctors", "doctor", "are smart", "is smart", "is not smart", "are not smart"),
+    ("mammals", "mammal", "have hair", "has hair", "does not have hair", "don't have hair"),
+    ("pilots", "pilot", "hold a license", "holds a license", "does not hold a license", "don't hold a license"),
+    ("chefs", "chef", "can cook", "can cook", "cannot cook", "cannot cook"),
+    ("poets", "poet", "write verse", "writes verse", "does not write verse", "don't write verse"),
+)
+
+NAMES = ("John", "Sarah", "Maria", "Ahmed", "Priya", "Liam", "Chen", "Olivia", "Kofi", "Elena")
+
+
+def _derive_sequence(v: Values) -> Values:
+    return {"terms": ', '.join(str(term) for term in v['seq'][:-1])}
+
+
+def _solve_sequence(v: Values, rng: random.Random):
+    terms = v['seq']
+    answer, last, previous = terms[-1], terms[-2], terms[-3]
+    return numeric_distractors(answer, (answer + (last - previous), last + (last - previous) // 2 + 1, answer - 2, answer + 1))
+
+
+def _derive_syllogism(v: Values) -> Values:
+    plural, singular, prop, prop_single, prop_negated, prop_some_negated = v['rule']
+    return {
+        "plural": plural, "singular": singular, "prop": prop,
+        "prop_single": prop_single, "prop_negated": prop_negated, "prop_some_negated": prop_some_negated
+    }
+
+
+def _solve_syllogism(v: Values, rng: random.Random):
+    answer = f"{v['name']} {v['prop_single']}"
+    return answer, [f"{v['name']} {v['prop_negated']}", "No conclusion can be drawn", f"Some {v['plural']} {v['prop_some_negated']}"]
+
+
+# --- Data -------------------------------------------------------------------
+
+SURVEY_ITEMS = (("apples", "oranges"), ("tea", "coffee"), ("cats", "dogs"), ("summer", "winter"), ("reading", "films"))
+
+
+def _derive_survey(v: Values) -> Values:
+    part = v['total'] * v['pct'] // 100
+    first, second = v['items']
+    return {"part": part, "rest": v['total'] - part, "first": first, "second": second}
+
+
+def _solve_survey(v: Values, rng: random.Random):
+    pct = v['pct']
+    return numeric_distractors(pct, (100 - pct, pct + 10, pct - 10, pct + 5), suffix='%')
+
+
+def _derive_increase(v: Values) -> Values:
+    return {"new": v['old'] * (100 + v['pct']) // 100}
+
+
+def _solve_increase(v: Values, rng: random.Random):
+    pct = v['pct']
+    return numeric_distractors(pct, (pct + 5, pct - 5, pct + 10, round(100 * (v['new'] - v['old']) / v['new'])), suffix='%')
+
+
+def _derive_average(v: Values) -> Values:
+    avg, up, down = v['avg'], v['up'], v['down']
+    return {"a": avg + up, "b": avg - down, "c": avg - up + down}
+
+
+def _solve_average(v: Values, rng: random.Random):
+    avg = v['avg']
+    return numeric_distractors(avg, (avg + 2, avg - 2, v['a'], avg + 5))
+
+
+def _derive_ratio(v: Values) -> Values:
+    girls = v['total'] - v['boys']
+    divisor = gcd(v['boys'], girls)
+    return {"girls": girls, "r_boys": v['boys'] // divisor, "r_girls": girls // divisor}
+
+
+def _solve_ratio(v: Values, rng: random.Random):
+    boys, girls, total = v['r_boys'], v['r_girls'], v['r_boys'] + v['r_girls']
+    answer = f"{boys}:{girls}"
+    candidates = (f"{girls}:{boys}", f"{boys}:{total}", f"{girls}:{total}", f"{boys + 1}:{girls}")
+    return answer, distinct(answer, candidates, lambda k: f"{boys + k}:{girls + k}")
+
+
+PARAMETRIC_TEMPLATES = (
+    compile_template(
+        'quant', 600, "What is {pct}% of {base}?",
+        "{pct}% of {base} is {pct}/100 × {base} = {answer}.",
+        (number('pct', 5, 95, 5), number('base', 20, 400, 20)), _solve_percent
+    ),
+    compile_template(
+        'quant', 700, "If a rectangle has length {length} and width {width}, what is its area?",
+        "Area = length × width = {length} × {width} = {answer}.",
+        (number('length', 3, 20), number('width', 2, 15)), _solve_rectangle
+    ),
+    compile_template(
+        'quant', 800, "If {a}x + {b} = {c}, what is x?",
+        "Subtract {b} from both sides to get {a}x = {c} - {b}, then divide by {a}: x = {answer}.",
+        (number('a', 2, 9), number('x', 2, 15), number('b', 1, 20)), _solve_linear, derive=_derive_linear
+    ),
+    compile_template(
+        'quant', 700, "What is {base}^{exp}?",
+        "{base} raised to the power {exp} is {answer}.",
+        (number('base', 2, 5), number('exp', 2, 6)), _solve_power, derive=_derive_power
+    ),
+    compile_template(
+        'verbal', 500, "What is the opposite of '{word}'?",
+        "'{answer}' means the opposite of '{word}'.",
+        (word('word', ANTONYMS),), _solve_antonym
+    ),
+    compile_template(
+        'verbal', 400, "What is a synonym for '{word}'?",
+        "'{answer}' has the same meaning as '{word}'.",
+        (word('word', SYNONYMS),), _solve_synonym
+    ),
+    compile_template(
+        'verbal', 600, "Complete the analogy: {first} is to {first_young} as {second} is to ___",
+        "A {first_young} is a young {first}, and a {answer} is a young {second}.",
+        (Slot('animals', WORD, ANIMAL_PAIRS),), _solve_animals, derive=_derive_animals
+    ),
+    compile_template(
+        'spatial', 600, "If you face {facing} and turn {side} {times}, which direction are you facing?",
+        "Each {side} turn is 90°; turning {side} {times} from {facing} leaves you facing {answer}.",
+        (direction('facing', ("north", "east", "south", "west")), word('side', ("right", "left")), word('times', TURNS)),
+        _solve_turn, fixed_choices=("North", "South", "East", "West")
+    ),
+    compile_template(
+        'spatial', 1000, "You walk {a} blocks {dir1}, then {b} blocks {dir2}. How far are you from your starting point?",
+        "The two legs are perpendicular, so the distance is √({a}² + {b}²) = {answer}.",
+        (Slot('triple', NUMBER, PYTHAGOREAN_TRIPLES), Slot('heading', DIRECTION, PERPENDICULAR)),
+        _solve_walk, derive=_derive_walk
+    ),
+    compile_template(
+        'logic', 900, "Complete the sequence: {terms}, ___",
+        "Each term is multiplied by the same ratio, so the next term is {answer}.",
+        (sequence('seq', GEOMETRIC_SEQUENCES),), _solve_sequence, derive=_derive_sequence
+    ),
+    compile_template(
+        'logic', 800, "What comes next: {terms}, ___",
+        "The terms increase by a constant difference, so the next term is {answer}.",
+        (sequence('seq', ARITHMETIC_SEQUENCES),), _solve_sequence, derive=_derive_sequence
+    ),
+    compile_template(
+        'logic', 900, "Complete the sequence: {terms}, ___",
+        "The terms are consecutive perfect squares, so the next term is {answer}.",
+        (sequence('seq', SQUARE_SEQUENCES),), _solve_sequence, derive=_derive_sequence
+    ),
+    compile_template(
+        'logic', 900, "If all {plural} {prop} and {name} is a {singular}, what can be concluded?",
+        "{name} is a {singular} and all {plural} {prop}, so {answer}.",
+        (Slot('rule', WORD, SYLLOGISMS), word('name', NAMES)), _solve_syllogism, derive=_derive_syllogism
+    ),
+    compile_template(
+        'data', 500, "In a survey of {total} people, {part} prefer {first} and {rest} prefer {second}. What percentage prefer {first}?",
+        "{part} out of {total} is {part}/{total} × 100 = {answer}.",
+        (number('total', 40, 400, 20), number('pct', 10, 90, 5), Slot('items', WORD, SURVEY_ITEMS)),
+        _solve_survey, derive=_derive_survey
+    ),
+    compile_template(
+        'data', 800, "If a company's revenue increased from ${old} to ${new}, what was the percentage increase?",
+        "The increase is ${new} - ${old}, which is {answer} of ${old}.",
+        (number('old', 500, 9000, 100), number('pct', 5, 60, 5)), _solve_increase, derive=_derive_increase
+    ),
+    compile_template(
+        'data', 600, "If a basketball player scores {a}, {b}, and {c} points in three games, what was their average?",
+        "({a} + {b} + {c}) / 3 = {answer}.",
+        (number('avg', 12, 40), number('up', 1, 8), number('down', 1, 8)), _solve_average, derive=_derive_average
+    ),
+    compile_template(
+        'data', 700, "In a class of {total} students, {boys} are boys. What is the ratio of boys to girls?",
+        "There are {total} - {boys} = {girls} girls, so boys to girls is {boys}:{girls}, which simplifies to {answer}.",
+        (number('total', 12, 40), number('boys', 5, 11)), _solve_ratio, derive=_derive_ratio
+    ),
+)
+
+
+def _build_index(templates: Iterable[QuestionTemplateSpec]) -> Dict[str, Tuple[QuestionTemplateSpec, ...]]:
+    index: Dict[str, List[QuestionTemplateSpec]] = {}
+    for template in templates:
+        index.setdefault(template.domain, []).append(template)
+    return {domain: tuple(items) for domain, items in index.items()}
+
+
+# Compiled once at import
+TEMPLATES_BY_DOMAIN = _build_index(PARAMETRIC_TEMPLATES)
+
+
+def templates_for_domain(domain: str) -> Tuple[QuestionTemplateSpec, ...]:
+    """Parameterised templates for a domain"""
+    return TEMPLATES_BY_DOMAIN.get(domain, ())
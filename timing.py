@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Request Stage Timing for Wit Content API
+Per-stage durations in a Server-Timing header, plus an opt-in sampling profiler
+"""
+
+import cProfile
+import os
+import random
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from flask import Flask, Response, g, has_request_context, request
+
+from metrics import record_stages
+from runtime_dir import DATA_DIR
+
+# Server-Timing headers are on by default; they add a few hundred bytes at most
+SERVER_TIMING_ENABLED = os.environ.get('WIT_SERVER_TIMING', '1').lower() not in ('0', 'false', 'no', 'off')
+
+# Fraction of requests profiled with cProfile, 0 (off) to 1 (every request)
+PROFILE_RATE = float(os.environ.get('WIT_PROFILE_RATE', 0))
+PROFILE_DIR = os.environ.get('WIT_PROFILE_DIR', os.path.join(DATA_DIR, 'profiles'))
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as one stage of the current request
+
+    Stages with the same name add up. Outside a request this is a no-op, so
+    shared helpers can be instrumented freely.
+    """
+    if not has_request_context() or 'stages' not in g:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages: Dict[str, float] = g.stages
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - started
+
+
+def _profile_path(route: str) -> str:
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', route).strip('-') or 'root'
+    return os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{os.getpid()}-{time.perf_counter_ns() % 1000000}.prof")
+
+
+def _start_request() -> None:
+    g.stages = {}
+    g.timing_started = time.perf_counter()
+    if PROFILE_RATE > 0 and random.random() < PROFILE_RATE:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler already owns this thread
+            return
+        g.profiler = profiler
+
+
+def _finish_request(response: Response) -> Response:
+    """Add the Server-Timing header; send time and profiles are recorded on close"""
+    started = g.pop('timing_started', None)
+    if started is None:
+        return response
+    stages: Dict[str, float] = g.stages
+    handled = time.perf_counter()
+    stages['app'] = handled - started
+
+    if SERVER_TIMING_ENABLED:
+        response.headers['Server-Timing'] = ', '.join(
+            f"{name};dur={seconds * 1000:.2f}" for name, seconds in stages.items()
+        )
+
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    profiler = g.pop('profiler', None)
+
+    def finish():
+        # For streamed responses, generation happens here, while the body is sent
+        stages['send'] = time.perf_counter() - handled
+        record_stages(route, stages)
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profiler.dump_stats(_profile_path(route))
+
+    response.call_on_close(finish)
+    return response
+
+
+def init_timing(app: Flask) -> None:
+    """Time request stages on an app
+
+    Register after init_metrics and before init_compression, so compression
+    is timed and included in the header.
+    """
+    app.before_request(_start_request)
+    app.after_request(_finish_request)